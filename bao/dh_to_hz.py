@@ -1,16 +1,21 @@
 # Finding D_H(z) H(z_eff)/1+z_eff from D_H/r_d
 
 from uncertainties import ufloat
-from main.lcdm import r_d_finder_LCDM, hubble_finder_LCDM
+from main.cache import derived_LCDM
 
 c = 299792.458  # speed of light in [km/s]
-h0_lcdm = hubble_finder_LCDM()
-r_d = r_d_finder_LCDM(h0_lcdm)
 
 # beta = D_H/r_d
 beta = ufloat(9.08, 0.34)
 z_eff = 2.33
-D_H = beta * r_d
 
-D_H_plot_value = (c / D_H) / (1+z_eff)
-print('{:.4u}'.format(D_H_plot_value))
+
+def plot_value():
+    """H(z_eff)/(1+z_eff) with its error"""
+    r_d = derived_LCDM()['r_d']
+    D_H = beta * r_d
+    return (c / D_H) / (1+z_eff)
+
+
+if __name__ == '__main__':
+    print('{:.4u}'.format(plot_value()))
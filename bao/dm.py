@@ -3,16 +3,21 @@
 import numpy as np
 from uncertainties import ufloat
 
-from main.lcdm import hubble_finder_LCDM, r_d_finder_LCDM
+from main.cache import derived_LCDM
 
 c = 299792.458  # speed of light in [km/s]
-h0_lcdm = hubble_finder_LCDM()
-r_d = r_d_finder_LCDM(h0_lcdm)
 
 # beta = D_M/r_d
 beta = ufloat(37.3, 1.7)
 z_eff = 2.33
-D_M = beta * r_d
 
-D_M_plot_value = (c * np.log(1+z_eff)) / D_M
-print('{:.4u}'.format(D_M_plot_value))
+
+def plot_value():
+    """cln(1+z_eff)/D_M(z_eff) with its error"""
+    r_d = derived_LCDM()['r_d']
+    D_M = beta * r_d
+    return (c * np.log(1+z_eff)) / D_M
+
+
+if __name__ == '__main__':
+    print('{:.4u}'.format(plot_value()))
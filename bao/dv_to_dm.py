@@ -3,22 +3,28 @@
 import numpy as np
 from uncertainties import ufloat, umath
 
-from main.lcdm import hubble_finder_LCDM, hubble_function_LCDM, r_d_finder_LCDM
+from main.cache import derived_LCDM
+from main.lcdm import hubble_function_LCDM
 
 #important parameters
 c = 299792.458  # speed of light in [km/s]
 
 z_eff = 0.85
 
-h0_lcdm = hubble_finder_LCDM()
-h_zeff = hubble_function_LCDM(z_eff, h0_lcdm)
-r_d = r_d_finder_LCDM(h0_lcdm)
-
 # beta = D_V/r_d
-
 beta = ufloat(18.33, 0.6)
-D_V = beta * r_d
-D_M = umath.sqrt((D_V**3 * h_zeff) / (c * z_eff))
 
-D_M_plot_value = (c * np.log(1+z_eff)) / D_M
-print('{:.4u}'.format(D_M_plot_value))
+
+def plot_value():
+    """cln(1+z_eff)/D_M(z_eff) with its error"""
+    lcdm_derived = derived_LCDM()
+    h0_lcdm, r_d = lcdm_derived['h0'], lcdm_derived['r_d']
+    h_zeff = hubble_function_LCDM(z_eff, h0_lcdm)
+
+    D_V = beta * r_d
+    D_M = umath.sqrt((D_V**3 * h_zeff) / (c * z_eff))
+    return (c * np.log(1+z_eff)) / D_M
+
+
+if __name__ == '__main__':
+    print('{:.4u}'.format(plot_value()))
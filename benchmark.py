@@ -0,0 +1,286 @@
+# Benchmarks of the main/ cosmology kernels
+# Wall time, number of integrals and accuracy against a high-precision
+# reference for the h0 solvers, a 5,000-point D_M curve, the mb_analysis.py
+# pass, the h0_contour.py grid and the z_dagger split of the quad integrals.
+# Results are saved as JSON so that runs on different commits can be compared:
+#     python benchmark.py                         -> data/benchmark_<commit>.json
+#     python benchmark.py --compare old.json new.json
+
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import time
+
+import numpy as np
+from scipy.integrate import quad
+from scipy.optimize import brentq
+
+import mb_analysis
+from main import cache, compiled, distances, gde_cdm, lcdm, models, state
+from main.params import planck18
+from main.sn_catalog import SNCatalog
+
+
+reference_rtol = 1e-13   # relative tolerance of the reference integrals
+u_max = 100   # ln(1+z) standing in for z = inf in the reference (the tail is ~e^-100)
+h0_tolerance = 1e-8   # largest acceptable change of h0 between two runs
+
+gde_points = [(-0.016, -18), (-0.010, -14), (-0.004, -8),
+              (-0.003, -6), (-0.001, -4)]   # (gamma, lambda) of the gDE solves, the last two with z_dagger > 1e17
+curve_point = (-0.016, -18)   # (gamma, lambda) of the D_M curve, Q crosses zero at z = 1.99
+curve_z = np.linspace(0.001, 2.5, 5000)   # redshifts of the D_M curve
+contour_stride = 7   # every contour_stride-th grid point is checked against the reference
+split_points = [(-0.001, -4), (-0.003, -6), (-0.016, -18)]   # (gamma, lambda) of the quad split check, z_dagger ~ 1e29 to 2
+split_h0 = 0.68   # h0 of the quad split check
+split_tolerance = 1e-8   # largest acceptable relative deviation of the split quad integrals
+
+
+#--------- COUNTING INTEGRALS ---------#
+
+# The integrators are looked up as module globals at call time, so wrapping
+# them in the module of the shared model kernels counts every integral.
+
+counted = {models: ('quad', 'sound_horizon_gauss', 'comoving_distance_gauss'),
+           distances: ('cumulative_integral',)}
+
+
+@contextlib.contextmanager
+def counting():
+    """Counting the calls of every integrator inside the with block"""
+    counts = {}
+    originals = []
+    def wrap(name, function):
+        def counted_function(*args, **kwargs):
+            counts[name] = counts.get(name, 0) + 1
+            return function(*args, **kwargs)
+        return counted_function
+    for module, names in counted.items():
+        for name in names:
+            originals.append((module, name, getattr(module, name)))
+            setattr(module, name, wrap(name, getattr(module, name)))
+    try:
+        yield counts
+    finally:
+        for module, name, function in originals:
+            setattr(module, name, function)
+
+
+def measure(func):
+    """Wall time, integral counts and result of func()"""
+    cache.clear_cache()
+    state.clear_states()
+    with counting() as counts:
+        start = time.perf_counter()
+        result = func()
+        wall_time = time.perf_counter() - start
+    return {'time': wall_time, 'integrals': dict(counts)}, result
+
+
+#--------- HIGH-PRECISION REFERENCE ---------#
+
+# quad at reference_rtol in u = ln(1+z) (z_dagger can be ~1e7), split at the
+# zero crossing of Q where it loses accuracy, and Brent's method solved to
+# machine precision.
+
+def reference_integral(integrand, lower, upper, z_dagger=None):
+    """Integral of integrand(z) from lower to upper (may be np.inf)"""
+    edges = [np.log1p(lower), min(np.log1p(upper), u_max)]
+    if z_dagger is not None and edges[0] < np.log1p(z_dagger) < edges[1]:
+        edges.insert(1, np.log1p(z_dagger))
+    return sum(quad(lambda u: integrand(np.expm1(u)) * np.exp(u), a, b, epsabs=0, epsrel=reference_rtol,
+                    limit=200)[0] for a, b in zip(edges[:-1], edges[1:]))
+
+
+def _model(point):
+    """H(z) of the point's model and the redshift where its integrand has a kink"""
+    if point is None:
+        return lambda h0: (lambda z: lcdm.hubble_function_LCDM(z, h0)), None
+    gamma, lamda = point
+    return (lambda h0: (lambda z: gde_cdm.hubble_function_gDE(z, h0, gamma, lamda)),
+            float(gde_cdm.z_dagger_finder(gamma, lamda)))
+
+
+def reference_hubble(point=None, params=planck18):
+    """h0 of LCDM (point=None) or of gDE at point=(gamma, lamda), None without a solution"""
+    hubble, z_dagger = _model(point)
+    def theta(h0):
+        H = hubble(h0)
+        c_s = lambda z: params.c / np.sqrt(3*(1 + 3*params.w_b/(4*params.w_p*(1+z))))
+        r_s = reference_integral(lambda z: c_s(z) / H(z), params.z_star, np.inf, z_dagger)
+        d_A = reference_integral(lambda z: params.c / H(z), 0, params.z_star, z_dagger)
+        return r_s / d_A - params.theta_true
+    if theta(0.4) * theta(1) > 0:
+        return None
+    return brentq(theta, 0.4, 1, xtol=1e-15, rtol=1e-15)
+
+
+def reference_d_M(z, h0, point=None, params=planck18):
+    """D_M at the sorted redshifts z, integrated panel by panel"""
+    hubble, z_dagger = _model(point)
+    H = hubble(h0)
+    edges = np.concatenate(([0.0], z))
+    panels = [reference_integral(lambda x: params.c / H(x), a, b, z_dagger) for a, b in zip(edges[:-1], edges[1:])]
+    return np.cumsum(panels)
+
+
+def h0_error(h0, reference):
+    """Largest |h0 - reference| over the points that have a reference solution"""
+    h0, reference = np.ravel(h0), np.array([np.nan if r is None else r for r in np.ravel(reference)], dtype=float)
+    return float(np.nanmax(np.abs(h0 - reference))) if np.isfinite(reference).any() else None
+
+
+#--------- BENCHMARKS ---------#
+
+def bench_hubble_LCDM():
+    reference = reference_hubble()
+    results = {}
+    for variant, fast in (('quad', False), ('fast', True)):
+        result, h0 = measure(lambda: lcdm.hubble_finder_LCDM(fast=fast))
+        results[variant] = dict(result, h0=[h0], h0_error=h0_error(h0, reference))
+    return results
+
+
+def bench_hubble_gDE():
+    reference = [reference_hubble(point) for point in gde_points]
+    results = {}
+    for variant, fast in (('quad', False), ('fast', True)):
+        result, h0 = measure(lambda: [gde_cdm.hubble_finder_gDE(*point, fast=fast) for point in gde_points])
+        results[variant] = dict(result, h0=h0, h0_error=h0_error(h0, reference))
+    return results
+
+
+def bench_d_M_curve():
+    gamma, lamda = curve_point
+    h0 = reference_hubble(curve_point)
+    reference = reference_d_M(curve_z, h0, curve_point)
+    variants = {'quad': lambda: [gde_cdm.d_M_function_gDE(z, h0, gamma, lamda) for z in curve_z],
+                'table': lambda: gde_cdm.distance_table_gDE(curve_z, h0, gamma, lamda)[0],
+                'fast': lambda: gde_cdm.d_M_function_gDE(curve_z, h0, gamma, lamda, fast=True)}
+    results = {}
+    for variant, func in variants.items():
+        result, d_M = measure(func)
+        results[variant] = dict(result, d_M_error=float(np.max(np.abs(np.asarray(d_M)/reference - 1))))
+    return results
+
+
+def bench_mb_analysis():
+    result, values = measure(mb_analysis.compute)
+    data = SNCatalog('mb_data.txt')
+    z_cmb, z_hel, m_b = np.array(data.z_cmb), np.array(data.z_hel), np.array(data.m_b)
+    order = np.argsort(z_cmb)
+    error = 0
+    for name, point in (('M_b_values_lcdm', None), ('M_b_values_gde', (mb_analysis.gamma, mb_analysis.lamda))):
+        d_M = np.empty_like(z_cmb)
+        d_M[order] = reference_d_M(z_cmb[order], reference_hubble(point), point)
+        M_B = m_b - (5*np.log10((1 + z_hel) * d_M) + 25)
+        error = max(error, float(np.max(np.abs(values[name] - M_B))))
+    return {'compute': dict(result, M_B_error=error)}
+
+
+def bench_h0_contour():
+    gamma_values = np.arange(-0.001, -0.018, -0.001)
+    lamda_values = np.arange(-4, -24.5, -0.5)
+    X, Y = np.meshgrid(gamma_values, lamda_values)
+    checked = slice(None, None, contour_stride)
+    reference = [reference_hubble(point) for point in zip(X.flat[checked], Y.flat[checked])]
+    def solve_quad():
+        solutions = [gde_cdm.hubble_finder_gDE(*point, full_output=True) for point in zip(X.flat, Y.flat)]
+        return (np.reshape([h0 for h0, info in solutions], X.shape),
+                np.reshape([info['converged'] for h0, info in solutions], X.shape))
+    variants = {'batch': lambda: gde_cdm.hubble_batch_gDE(X, Y), 'quad': solve_quad}
+    results = {}
+    for variant, func in variants.items():
+        result, (Z, converged) = measure(func)
+        results[variant] = dict(result, h0=Z.ravel().tolist(), converged=int(converged.sum()),
+                                h0_error=h0_error(Z.flat[checked], reference))
+    return results
+
+
+def bench_quad_split():
+    """r_s and r_d against quad without the z_dagger split, d_A(z_*) against the reference"""
+    params = planck18
+    c_s = lambda z: params.c / np.sqrt(3*(1 + 3*params.w_b/(4*params.w_p*(1+z))))
+    def run():
+        return [(gde_cdm.r_s_finder_gDE(split_h0, *point), gde_cdm.r_d_finder_gDE(split_h0, *point),
+                 gde_cdm.d_A_finder_gDE(split_h0, *point)) for point in split_points]
+    result, values = measure(run)
+    error = 0
+    for point, (r_s, r_d, d_A) in zip(split_points, values):
+        H, z_dagger = _model(point)
+        H = H(split_h0)
+        unsplit = [quad(lambda z: c_s(z) / H(z), lower, np.inf)[0] for lower in (params.z_star, params.z_d)]
+        exact = reference_integral(lambda z: params.c / H(z), 0, params.z_star, z_dagger)
+        error = max(error, *np.abs(np.divide((r_s, r_d, d_A), unsplit + [exact]) - 1))
+        if error > split_tolerance:
+            raise AssertionError('quad integrals at (gamma, lambda) = {} deviate by {:.1e}'.format(point, error))
+    return {'quad': dict(result, split_error=float(error))}
+
+
+benchmarks = {'hubble_finder_LCDM': bench_hubble_LCDM,
+              'hubble_finder_gDE': bench_hubble_gDE,
+              'd_M_curve': bench_d_M_curve,
+              'mb_analysis': bench_mb_analysis,
+              'h0_contour': bench_h0_contour,
+              'quad_split': bench_quad_split}
+
+
+def run_benchmarks(names=None):
+    """Running the benchmarks (all by default), returns their results"""
+    compiled.available()   # compiling or loading the integrands is not part of any benchmark
+    results = {}
+    for name in names or benchmarks:
+        results[name] = benchmarks[name]()
+        for variant, result in results[name].items():
+            errors = {key: value for key, value in result.items() if key.endswith('error')}
+            print('{:20} {:10} {:9.4f} s  {}  {}'.format(name, variant, result['time'], result['integrals'], errors))
+    return results
+
+
+#--------- COMPARING RUNS ---------#
+
+def compare(old_path, new_path):
+    """Printing the speedup of every benchmark and whether h0 moved by more than h0_tolerance"""
+    with open(old_path) as old_file, open(new_path) as new_file:
+        old, new = json.load(old_file)['benchmarks'], json.load(new_file)['benchmarks']
+    unchanged = True
+    for name in new:
+        for variant in new[name].keys() & old.get(name, {}).keys():
+            before, after = old[name][variant], new[name][variant]
+            line = '{:20} {:10} {:9.4f} s -> {:9.4f} s  ({:.1f}x)'.format(
+                name, variant, before['time'], after['time'], before['time'] / after['time'])
+            if 'h0' in before and 'h0' in after:
+                shift = float(np.max(np.abs(np.subtract(before['h0'], after['h0']))))
+                unchanged &= shift <= h0_tolerance
+                line += '  max |delta h0| = {:.1e}{}'.format(shift, '' if shift <= h0_tolerance else '  CHANGED')
+            print(line)
+    return unchanged
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmarks of the main/ cosmology kernels')
+    parser.add_argument('names', nargs='*', help='benchmarks to run, all by default: ' + ', '.join(benchmarks))
+    parser.add_argument('--output', help='JSON file of the results (default data/benchmark_<commit>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help='compare two result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        raise SystemExit(0 if compare(*args.compare) else 1)
+    commit = _commit()
+    output = args.output or os.path.join('data', 'benchmark_{}.json'.format(commit))
+    results = run_benchmarks(args.names)
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump({'commit': commit, 'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                   'compiled_integrands': compiled.available(), 'benchmarks': results},
+                  handle, indent=1)
+    print('saved', output)
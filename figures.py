@@ -0,0 +1,87 @@
+# Computing and plotting the data of every figure
+#
+#     python figures.py compute [figure ...]   -> data/figures/<figure>.npz
+#     python figures.py plot [figure ...]      -> plots/*.eps from those files
+#
+# The compute stage never imports matplotlib, so it runs headless on compute
+# nodes, with the figures computed in parallel; the plot stage only reads the
+# .npz files and can run on another machine. Each figure script also still
+# runs on its own (python h0_contour.py computes and plots).
+
+import argparse
+import concurrent.futures
+import importlib
+import os
+import time
+
+import numpy as np
+
+
+figures = ('bao', 'hubble_data', 'q_vs_z_varying_lambda', 'eos_parameter', 'z_dagger_contour',
+           'h0_contour', 'omega_m_parameter', 'lambda_vs_h0', 'mb_analysis')   # figure scripts
+data_dir = os.path.join('data', 'figures')   # directory of the computed data
+
+
+def data_path(name, directory=data_dir):
+    return os.path.join(directory, name + '.npz')
+
+
+def compute_figure(name, directory=data_dir):
+    """Computing the data of one figure into its .npz file, returns the path and time taken"""
+    start = time.perf_counter()
+    data = importlib.import_module(name).compute()
+    os.makedirs(directory, exist_ok=True)
+    path = data_path(name, directory)
+    temporary = path[:-len('.npz')] + '.tmp.npz'
+    np.savez(temporary, **data)
+    os.replace(temporary, path)
+    return path, time.perf_counter() - start
+
+
+def compute_figures(names=figures, jobs=None, directory=data_dir):
+    """Computing the data of the figures, jobs of them at a time (one per core by default)"""
+    jobs = jobs or min(len(names), os.cpu_count())
+    if jobs == 1:
+        results = (compute_figure(name, directory) for name in names)
+    else:
+        # the scans inside omega_m_parameter open their own pools, which the
+        # non-daemonic workers of ProcessPoolExecutor allow
+        executor = concurrent.futures.ProcessPoolExecutor(jobs)
+        results = executor.map(compute_figure, names, [directory]*len(names))
+    try:
+        for name, (path, seconds) in zip(names, results):
+            print('{:24} {:8.1f} s  {}'.format(name, seconds, path))
+    finally:
+        if jobs != 1:
+            executor.shutdown()
+
+
+def plot_figures(names=figures, directory=data_dir, show=False):
+    """Drawing the figures from their computed data"""
+    for name in names:
+        path = data_path(name, directory)
+        if not os.path.exists(path):
+            raise SystemExit('{} has not been computed, run: python figures.py compute {}'.format(path, name))
+        with np.load(path) as data:
+            importlib.import_module(name).plot(data, show)
+        print('{:24} plotted'.format(name))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Computing and plotting the figure data')
+    parser.add_argument('stage', choices=('compute', 'plot'))
+    parser.add_argument('names', nargs='*', metavar='figure',
+                        help='figures to process, all by default: ' + ', '.join(figures))
+    parser.add_argument('--jobs', type=int, help='figures computed in parallel (default: one per core)')
+    parser.add_argument('--data', default=data_dir, help='directory of the computed data')
+    parser.add_argument('--show', action='store_true', help='also show every figure on screen')
+    args = parser.parse_args()
+
+    names = tuple(args.names) or figures
+    unknown = set(names) - set(figures)
+    if unknown:
+        parser.error('unknown figures: ' + ', '.join(sorted(unknown)))
+    if args.stage == 'compute':
+        compute_figures(names, args.jobs, args.data)
+    else:
+        plot_figures(names, args.data, args.show)
@@ -1,21 +1,9 @@
 # gDE-CDM Model Calculations
 # Plotting H_0 as a function of gamma and lambda - Contour Plot
 
-import matplotlib.pylab as pylab
-import matplotlib.pyplot as plt
-import matplotlib.ticker as tck
-from matplotlib import cm
 import numpy as np
 
-from main.gde_cdm import hubble_finder_gDE
-
-# Adjusting size of the figure
-params = {'legend.fontsize': '14',
-          'figure.figsize': (19.20, 10.80),
-          'axes.labelsize': '20',
-          'xtick.labelsize':'20',
-          'ytick.labelsize':'20'}
-pylab.rcParams.update(params)
+from main.gde_cdm import hubble_batch_gDE
 
 
 # gamma values starting from gamma = -0.001 to gamma = -0.018 with step size 0.001
@@ -25,40 +13,63 @@ gamma_values = np.arange(-0.001, -0.018, -0.001)
 lamda_values = np.arange(-4, -24.5, -0.5)
 
 
-X, Y = np.meshgrid(gamma_values, lamda_values)
+def compute():
+    """Computing H_0 on the (gamma, lambda) grid"""
+    # All points solved in lock-step on arrays; Z[j, i] belongs to (gamma_i, lambda_j).
+    X, Y = np.meshgrid(gamma_values, lamda_values)
+    Z, converged = hubble_batch_gDE(X, Y)
+    return {'X': X, 'Y': Y, 'Z': Z, 'converged': converged}
+
+
+def plot(data, show=True):
+    """Drawing the figure from the data of compute()"""
+    import matplotlib.pylab as pylab
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as tck
+    from matplotlib import cm
+
+    # Adjusting size of the figure
+    params = {'legend.fontsize': '14',
+              'figure.figsize': (19.20, 10.80),
+              'axes.labelsize': '20',
+              'xtick.labelsize':'20',
+              'ytick.labelsize':'20'}
+    pylab.rcParams.update(params)
+
+    X, Y, Z = data['X'], data['Y'], data['Z']
+
+    # ---------- PLOTTING ----------
 
-variable_grid_data = list((x, y) for x in gamma_values for y in lamda_values)
-data_points = [hubble_finder_gDE(x, y) for (x, y) in variable_grid_data]
-new_points = np.reshape(data_points, (len(gamma_values), len(lamda_values)))
-Z = np.transpose(new_points)
+    # latex rendering text fonts
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
 
-# ---------- PLOTTING ----------
 
-# latex rendering text fonts
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+    fig, ax0 = plt.subplots()  # adjusting the size of the figure
+    plt.contourf(X, Y, Z, cmap=cm.plasma, antialiased=True)
 
+    # ---------- GRAPH OPTIONS ----------
 
-fig, ax0 = plt.subplots()  # adjusting the size of the figure
-plt.contourf(X, Y, Z, cmap=cm.plasma, antialiased=True)
+    # Setting Limits
+    ax0.set_xlim(-0.001, -0.018)
+    # Setting Labels
+    ax0.set_xlabel('$\gamma$')
+    ax0.set_ylabel('$\lambda$')
+    # Minor Ticks
+    ax0.get_yaxis().set_major_formatter(tck.ScalarFormatter())
+    # Tick Options
+    ax0.tick_params(which='major', width=1, size=7, direction='in')
+    # Other Options
+    cbar = plt.colorbar()
+    cbar.set_label('$H_0$')
+    plt.imshow(Z, vmin=0., vmax=3., cmap=cm.plasma, origin='lower', extent=[X.min(), X.max(), Y.min(), Y.max()], aspect=8)
+    plt.axis('tight')
+    if show:
+        plt.show()
 
-# ---------- GRAPH OPTIONS ----------
+    ax0.set_rasterized(True)
+    fig.savefig('plots/h0_contour.eps',rasterized=True,dpi=600)
 
-# Setting Limits
-ax0.set_xlim(-0.001, -0.018)
-# Setting Labels
-ax0.set_xlabel('$\gamma$')
-ax0.set_ylabel('$\lambda$')
-# Minor Ticks
-ax0.get_yaxis().set_major_formatter(tck.ScalarFormatter())
-# Tick Options
-ax0.tick_params(which='major', width=1, size=7, direction='in')
-# Other Options
-cbar = plt.colorbar()
-cbar.set_label('$H_0$')
-plt.imshow(Z, vmin=0., vmax=3., cmap=cm.plasma, origin='lower', extent=[X.min(), X.max(), Y.min(), Y.max()], aspect=8)
-plt.axis('tight')
-plt.show()
 
-ax0.set_rasterized(True)
-fig.savefig('plots/h0_contour.eps',rasterized=True,dpi=600)
+if __name__ == '__main__':
+    plot(compute())
@@ -1,21 +1,11 @@
 # gDE-CDM Model Calculations
 # Plotting the Hubble Data Obtained from Table 2 in https://arxiv.org/pdf/1802.01505.pdf
 
-import matplotlib.pylab as pylab
-import matplotlib.pyplot as plt
-import matplotlib.ticker as tck
 import numpy as np
 
-from main.gde_cdm import E_function_gDE, hubble_finder_gDE
-from main.lcdm import E_function_LCDM, hubble_finder_LCDM
-
-# Adjusting size of the figure
-params = {'legend.fontsize': '14',
-          'figure.figsize': (19.20, 10.80),
-          'axes.labelsize': '20',
-          'xtick.labelsize':'20',
-          'ytick.labelsize':'20'}
-pylab.rcParams.update(params)
+from main.cache import hubble_gDE, hubble_LCDM
+from main.gde_cdm import E_function_gDE
+from main.lcdm import E_function_LCDM
 
 # z values that will be used for the x axis. Runs from z=0 to z=1 with step size 0.001
 z_values = np.arange(0, 1, 0.001)
@@ -23,79 +13,103 @@ z_values = np.arange(0, 1, 0.001)
 # Adjusting the z_dagger parameter
 gamma_test = -0.017
 
-# Hubble Constants
-h0_lcdm = hubble_finder_LCDM()
-h0_8 = hubble_finder_gDE(gamma_test, -8)
-h0_12 = hubble_finder_gDE(gamma_test, -12)
-h0_16 = hubble_finder_gDE(gamma_test, -16)
-h0_20 = hubble_finder_gDE(gamma_test, -20)
+# Lambda values of the plotted gDE curves
+lamda_values = np.array([-8, -12, -16, -20])
+
+
+def compute():
+    """Computing E(z) of LCDM and of gDE for every lambda value"""
+    # Hubble Constants
+    h0_lcdm = hubble_LCDM()
+    h0_gde = np.array([hubble_gDE(gamma_test, lamda) for lamda in lamda_values])
+
+    # ---------- E(z) ----------
+    # One broadcast call per model: rows are the lambda values, columns the z values
+    Ez_LCDM = E_function_LCDM(z_values, h0_lcdm)
+    Ez_gDE = E_function_gDE(z_values[None, :], h0_gde[:, None], gamma_test, lamda_values[:, None])
+    return {'z_values': z_values, 'Ez_LCDM': Ez_LCDM, 'Ez_gDE': Ez_gDE}
+
+
+def plot(data, show=True):
+    """Drawing the figure from the data of compute()"""
+    import matplotlib.pylab as pylab
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as tck
+
+    # Adjusting size of the figure
+    params = {'legend.fontsize': '14',
+              'figure.figsize': (19.20, 10.80),
+              'axes.labelsize': '20',
+              'xtick.labelsize':'20',
+              'ytick.labelsize':'20'}
+    pylab.rcParams.update(params)
+
+    z_values, Ez_LCDM = data['z_values'], data['Ez_LCDM']
+    Ez_8, Ez_12, Ez_16, Ez_20 = data['Ez_gDE']
 
-# ---------- E(z) ----------
-Ez_LCDM = [E_function_LCDM(z, h0_lcdm) for z in z_values]
-Ez_8 = [E_function_gDE(z, h0_8, gamma_test, -8) for z in z_values]
-Ez_12 = [E_function_gDE(z, h0_12 , gamma_test, -12) for z in z_values]
-Ez_16 = [E_function_gDE(z, h0_16 , gamma_test, -16) for z in z_values]
-Ez_20 = [E_function_gDE(z, h0_20 , gamma_test, -20) for z in z_values]
+    # ---------- PLOTTING ----------
 
+    # latex rendering text fonts
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
 
-# ---------- PLOTTING ----------
+    # Function (1+x)**(1/2)
+    def forward(x):
+        return (1+x)**(1/2)
 
-# latex rendering text fonts
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+    def inverse(x):
+        return x**2-1
 
-# Function (1+x)**(1/2)
-def forward(x):
-	return (1+x)**(1/2)
 
-def inverse(x):
-    return x**2-1
+    fig, ax0 = plt.subplots()
 
+    # ---------- AX0 ----------
 
-fig, ax0 = plt.subplots()
+    ax0.plot(z_values, Ez_LCDM, linestyle='-',
+            color='black', label='$\Lambda$CDM')
 
-# ---------- AX0 ----------
+    ax0.plot(z_values, Ez_8, linestyle=(0, (1, 1)),
+            color='#CC6677', label='$\lambda = -8$')
 
-ax0.plot(z_values, Ez_LCDM, linestyle='-',
-        color='black', label='$\Lambda$CDM')
+    ax0.plot(z_values, Ez_12, linestyle=(0, (5, 10)),
+            color='#DDCC77', label='$\lambda = -12$')
 
-ax0.plot(z_values, Ez_8, linestyle=(0, (1, 1)),
-        color='#CC6677', label='$\lambda = -8$')
+    ax0.plot(z_values, Ez_16, linestyle=(0, (5, 1)),
+            color='#999933', label='$\lambda = -16$')
 
-ax0.plot(z_values, Ez_12, linestyle=(0, (5, 10)),
-        color='#DDCC77', label='$\lambda = -12$')
+    ax0.plot(z_values, Ez_20, linestyle=(0, (3, 1, 1, 1, 1, 1)),
+            color='#44AA99', label='$\lambda = -20$')
 
-ax0.plot(z_values, Ez_16, linestyle=(0, (5, 1)),
-        color='#999933', label='$\lambda = -16$')
 
-ax0.plot(z_values, Ez_20, linestyle=(0, (3, 1, 1, 1, 1, 1)),
-        color='#44AA99', label='$\lambda = -20$')
+    # ---------- GRAPH OPTIONS ----------
 
+    # Setting Limits
+    ax0.set_xlim(1, 0)
+    # Setting Labels
+    ax0.set_ylabel('$E(z)$')
+    ax0.set_xlabel('$z$')
+    # Minor Ticks
+    ax0.yaxis.set_ticks_position('both')
+    ax0.xaxis.set_ticks_position('both')
+    ax0.yaxis.set_minor_locator(tck.AutoMinorLocator())
+    # Tick Options
+    ax0.tick_params(which='major', width=1, size=7, direction='in')
+    ax0.tick_params(which='minor', width=0.6, size=4, direction='in')
+    # Other Options
+    ax0.set_xscale('function', functions=(forward, inverse))
+    ax0.legend()
 
-# ---------- GRAPH OPTIONS ----------
+    # Mean values and Errors for E(z) data obtained from Table 2 in given article
+    ax0.errorbar(0.07, 0.997, yerr=0.023, fmt='o', ecolor='blue')
+    ax0.errorbar(0.20, 1.111, yerr=0.020, fmt='o', ecolor='blue')
+    ax0.errorbar(0.35, 1.128 , yerr=0.037, fmt='o', ecolor='blue')
+    ax0.errorbar(0.55, 1.364, yerr=0.063, fmt='o', ecolor='blue')
+    ax0.errorbar(0.90, 1.52, yerr=0.12, fmt='o', ecolor='blue')
 
-# Setting Limits
-ax0.set_xlim(1, 0)
-# Setting Labels
-ax0.set_ylabel('$E(z)$')
-ax0.set_xlabel('$z$')
-# Minor Ticks
-ax0.yaxis.set_ticks_position('both')
-ax0.xaxis.set_ticks_position('both')
-ax0.yaxis.set_minor_locator(tck.AutoMinorLocator())
-# Tick Options
-ax0.tick_params(which='major', width=1, size=7, direction='in')
-ax0.tick_params(which='minor', width=0.6, size=4, direction='in')
-# Other Options
-ax0.set_xscale('function', functions=(forward, inverse))
-ax0.legend()
+    if show:
+        plt.show()
+    fig.savefig('plots/E_function_17.eps',rasterized=True,dpi=600)
 
-# Mean values and Errors for E(z) data obtained from Table 2 in given article
-ax0.errorbar(0.07, 0.997, yerr=0.023, fmt='o', ecolor='blue')
-ax0.errorbar(0.20, 1.111, yerr=0.020, fmt='o', ecolor='blue')
-ax0.errorbar(0.35, 1.128 , yerr=0.037, fmt='o', ecolor='blue')
-ax0.errorbar(0.55, 1.364, yerr=0.063, fmt='o', ecolor='blue')
-ax0.errorbar(0.90, 1.52, yerr=0.12, fmt='o', ecolor='blue')
 
-plt.show()
-fig.savefig('plots/E_function_17.eps',rasterized=True,dpi=600)
+if __name__ == '__main__':
+    plot(compute())
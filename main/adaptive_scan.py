@@ -0,0 +1,87 @@
+import numpy as np
+
+from main.grid_scan import evaluate_points
+
+
+#--------- ADAPTIVE REFINEMENT OF A (gamma, lambda) MAP ---------#
+
+# The map is solved on a coarse grid first. A cell is split into four when
+# the values at its corners spread by more than tol or a requested contour
+# level lies between them; the new edge midpoints and the centre are solved
+# in one parallel batch per refinement level. After depth levels the result
+# lives on the grid with 2**depth times the coarse resolution, where every
+# point that was not solved is bilinearly interpolated from the corners of
+# the smallest cell containing it.
+
+
+def _refine_flags(values, i, j, s, levels, tol):
+    """Cells with lower-left corner (i, j) and size s that need refining"""
+    corners = np.array([values[j, i], values[j, i+s], values[j+s, i], values[j+s, i+s]])
+    low, high = corners.min(axis=0), corners.max(axis=0)
+    refine = high - low > tol
+    for level in levels:
+        refine |= (low < level) & (level <= high)
+    return refine
+
+
+def _fill_cells(values, known, i, j, s):
+    """Bilinear interpolation of the points inside the cells that were not solved"""
+    t = np.arange(s + 1) / s
+    jj, ii = np.broadcast_arrays(j[:, None, None] + np.arange(s + 1)[None, :, None],
+                                 i[:, None, None] + np.arange(s + 1)[None, None, :])
+    tx, ty = t[None, None, :], t[:, None][None, :, :]
+    v00, v10 = values[j, i][:, None, None], values[j, i+s][:, None, None]
+    v01, v11 = values[j+s, i][:, None, None], values[j+s, i+s][:, None, None]
+    block = (v00*(1-tx)*(1-ty) + v10*tx*(1-ty)
+             + v01*(1-tx)*ty + v11*tx*ty)
+    missing = ~known[jj, ii]
+    values[jj[missing], ii[missing]] = block[missing]
+
+
+def adaptive_scan(func, gamma_range, lamda_range, coarse=(9, 9), depth=4, levels=(), tol=None,
+                  processes=None, progress=False):
+    """Evaluating func(gamma, lamda) on an adaptively refined grid
+
+    gamma_range and lamda_range are the (first, last) values of the axes and
+    coarse the number of (gamma, lambda) points of the starting grid. Cells
+    are refined depth times at most, wherever their values spread by more
+    than tol (by default 1/100 of the range found on the coarse grid) or
+    cross one of the contour levels. Returns X, Y, Z on the finest grid as
+    scan_grid does, plus the mask of the points that were actually solved.
+    """
+    s = 2**depth
+    gamma_values = np.linspace(*gamma_range, (coarse[0] - 1)*s + 1)
+    lamda_values = np.linspace(*lamda_range, (coarse[1] - 1)*s + 1)
+    X, Y = np.meshgrid(gamma_values, lamda_values)
+    values = np.full(X.shape, np.nan)
+    known = np.zeros(X.shape, dtype=bool)
+
+    def solve(j, i):
+        flat = np.unique(np.ravel_multi_index((j, i), X.shape))
+        flat = flat[~known.flat[flat]]
+        points = zip(X.flat[flat], Y.flat[flat])
+        values.flat[flat] = evaluate_points(func, points, processes, progress=progress)
+        known.flat[flat] = True
+
+    j, i = np.meshgrid(np.arange(0, X.shape[0], s), np.arange(0, X.shape[1], s), indexing='ij')
+    solve(j.ravel(), i.ravel())
+    if tol is None:
+        tol = (values[known].max() - values[known].min()) / 100
+
+    # cells are identified by their lower-left corner and size s
+    j, i = np.meshgrid(np.arange(0, X.shape[0] - 1, s), np.arange(0, X.shape[1] - 1, s), indexing='ij')
+    i, j = i.ravel(), j.ravel()
+    while True:
+        if s > 1:
+            refine = _refine_flags(values, i, j, s, levels, tol)
+        else:
+            refine = np.zeros(len(i), dtype=bool)
+        _fill_cells(values, known, i[~refine], j[~refine], s)
+        if not refine.any():
+            break
+        i, j, h = i[refine], j[refine], s // 2
+        solve(np.concatenate((j, j + h, j + h, j + h, j + s)),
+              np.concatenate((i + h, i, i + h, i + s, i + h)))
+        i, j = np.concatenate((i, i + h, i, i + h)), np.concatenate((j, j, j + h, j + h))
+        s = h
+    return X, Y, values, known
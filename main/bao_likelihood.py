@@ -0,0 +1,86 @@
+import numpy as np
+
+from main.models import get_model
+from main.params import planck18
+from main.state import state
+
+
+#--------- BAO MEASUREMENTS ---------#
+
+# eBOSS DR16 compilation, https://arxiv.org/pdf/2007.08991.pdf Table 3. These
+# are the D_X/r_d values the points drawn in bao.py (and converted in bao/)
+# were obtained from, with the LCDM r_d.
+# survey, z_eff, measured quantity, D_X / r_d, error
+bao_data = [
+    ('MGS', 0.15, 'D_V', 4.47, 0.17),
+    ('BOSS Galaxy', 0.38, 'D_M', 10.23, 0.17),
+    ('BOSS Galaxy', 0.38, 'D_H', 25.00, 0.76),
+    ('BOSS Galaxy', 0.51, 'D_M', 13.36, 0.21),
+    ('BOSS Galaxy', 0.51, 'D_H', 22.33, 0.58),
+    ('eBOSS', 0.70, 'D_M', 17.86, 0.33),
+    ('eBOSS', 0.70, 'D_H', 19.33, 0.53),
+    ('eBOSS', 0.85, 'D_V', 18.33, 0.6),
+    ('eBOSS', 1.48, 'D_M', 30.69, 0.80),
+    ('eBOSS', 1.48, 'D_H', 13.26, 0.55),
+    ('Lya-Lya', 2.33, 'D_M', 37.6, 1.9),
+    ('Lya-Lya', 2.33, 'D_H', 8.93, 0.28),
+    ('Lya-Quasar', 2.33, 'D_M', 37.3, 1.7),
+    ('Lya-Quasar', 2.33, 'D_H', 9.08, 0.34),
+]
+
+quantities = ('D_M', 'D_H', 'D_V')   # order of the distances in a distance table
+
+
+#--------- BAO LIKELIHOOD ---------#
+
+class BAOLikelihood:
+    """chi^2 of the BAO distance ratios D_M/r_d, D_H/r_d and D_V/r_d
+
+    The model distances at every z_eff come from one distance table; r_d and
+    the table are taken from the shared state of the point (main/state.py)
+    unless h0 is given explicitly. cov is an optional
+    full covariance of the measurements, otherwise they are uncorrelated.
+    params is the cosmological parameter set of the models.
+    """
+
+    def __init__(self, data=bao_data, cov=None, params=planck18):
+        self.params = params
+        self.survey = [row[0] for row in data]
+        self.z_eff = np.array([row[1] for row in data])
+        self.quantity = np.array([quantities.index(row[2]) for row in data])
+        self.value = np.array([row[3] for row in data])
+        self.error = np.array([row[4] for row in data])
+        covariance = np.diag(self.error**2) if cov is None else np.asarray(cov)
+        self.inv_cov = np.linalg.inv(covariance)
+
+    def prediction(self, table, r_d):
+        """Model D_X/r_d of every measurement from a (D_M, D_H, D_V, D_L) distance table"""
+        return np.stack(table[:3])[self.quantity, np.arange(len(self.value))] / r_d
+
+    def prediction_model(self, model, *point, h0=None):
+        """Model D_X/r_d of any registered model (main/models.py) at point"""
+        if h0 is None:
+            shared = state(model, *point, params=self.params)
+            return self.prediction(shared.distances(self.z_eff), shared.r_d)
+        model = get_model(model)
+        r_d = model.r_d(h0, *point, params=self.params)
+        return self.prediction(model.distance_table(self.z_eff, h0, *point, params=self.params), r_d)
+
+    def prediction_LCDM(self, h0=None):
+        return self.prediction_model('LCDM', h0=h0)
+
+    def prediction_gDE(self, gamma, lamda, h0=None):
+        return self.prediction_model('gDE', gamma, lamda, h0=h0)
+
+    def chi2(self, prediction):
+        residual = self.value - prediction
+        return residual @ self.inv_cov @ residual
+
+    def chi2_model(self, model, *point, h0=None):
+        return self.chi2(self.prediction_model(model, *point, h0=h0))
+
+    def chi2_LCDM(self, h0=None):
+        return self.chi2(self.prediction_LCDM(h0))
+
+    def chi2_gDE(self, gamma, lamda, h0=None):
+        return self.chi2(self.prediction_gDE(gamma, lamda, h0))
@@ -0,0 +1,134 @@
+import contextlib
+import functools
+import json
+import os
+
+from main.models import get_model
+from main.params import planck18
+
+try:
+    import fcntl
+except ImportError:   # not on Windows, where the appended lines are not locked
+    fcntl = None
+
+
+cache_size = 4096   # number of parameter points kept in memory
+disk_path = os.environ.get('LGCDM_CACHE')   # optional JSON-lines store shared by runs
+cache_version = 2   # part of every on-disk key, raised whenever the solved values change
+
+derived_names = ('h0', 'r_s', 'r_d', 'd_A')   # cached quantities of each point
+
+
+#--------- ON-DISK STORE ---------#
+
+# Entries are keyed on the model, its parameters and the cosmological
+# parameter set (CosmoParams) the solution depends on, so changing a constant
+# never serves stale values, and on cache_version, so entries written before
+# a change of the solvers or integrators are ignored. The store is an
+# append-only log with one JSON line [key, values] per solved point, written
+# under an exclusive file lock, so several processes (e.g. the workers of a
+# grid scan) can share it without losing entries. Each process keeps the
+# entries it has read and only parses the lines appended since.
+
+_entries = {}   # entries of the store read so far
+_read_offset = 0   # bytes of the store parsed into _entries
+
+
+@contextlib.contextmanager
+def _locked(handle, exclusive=True):
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+    try:
+        yield
+    finally:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def _read_store():
+    """The entries of the store, reading only the lines appended since the last call"""
+    global _read_offset
+    try:
+        with open(disk_path, 'rb') as store, _locked(store, exclusive=False):
+            store.seek(_read_offset)
+            appended = store.read()
+    except FileNotFoundError:
+        return _entries
+    complete = appended.rfind(b'\n') + 1
+    for line in appended[:complete].splitlines():
+        try:
+            key, values = json.loads(line)
+        except ValueError:
+            continue
+        _entries[key] = values
+    _read_offset += complete
+    return _entries
+
+
+def _write_entry(key, values):
+    with open(disk_path, 'a') as store, _locked(store):
+        store.write(json.dumps([key, values]) + '\n')
+        store.flush()   # the line is complete before the lock is released
+    _entries[key] = values
+
+
+def set_disk_cache(path):
+    """Using the JSON-lines file at path as on-disk store (None disables it)"""
+    global disk_path, _read_offset
+    disk_path = path
+    _entries.clear()
+    _read_offset = 0
+
+
+#--------- MEMOIZED SOLUTIONS ---------#
+
+def _solve(model, point, params):
+    """Solving h0 and the derived r_s, r_d and d_A(z_*) of one parameter point"""
+    model = get_model(model)
+    h0 = model.hubble_finder(*point, params=params)
+    return (h0, model.r_s(h0, *point, params=params), model.r_d(h0, *point, params=params),
+            model.d_A(h0, *point, params=params))
+
+
+@functools.lru_cache(maxsize=cache_size)
+def _derived(model, point, params):
+    key = repr((model, point, params.values(), cache_version))
+    if disk_path is not None:
+        values = _read_store().get(key)
+        if values is not None:
+            return tuple(values)
+    values = _solve(model, point, params)
+    if disk_path is not None:
+        _write_entry(key, values)
+    return values
+
+
+def derived(model, point=(), params=planck18):
+    """h0, r_s, r_d and d_A(z_*) of any registered model (by name) at point, solved once per point"""
+    return dict(zip(derived_names, _derived(get_model(model).name, tuple(float(p) for p in point), params)))
+
+
+def derived_LCDM(params=planck18):
+    """h0, r_s, r_d and d_A(z_*) of LCDM, solved once per process (or store)"""
+    return dict(zip(derived_names, _derived('LCDM', (), params)))
+
+
+def derived_gDE(gamma, lamda, params=planck18):
+    """h0, r_s, r_d and d_A(z_*) of gDE, solved once per (gamma, lamda)"""
+    return dict(zip(derived_names, _derived('gDE', (float(gamma), float(lamda)), params)))
+
+
+def hubble_LCDM(params=planck18):
+    """Cached hubble_finder_LCDM()"""
+    return _derived('LCDM', (), params)[0]
+
+
+def hubble_gDE(gamma, lamda, params=planck18):
+    """Cached hubble_finder_gDE(gamma, lamda)"""
+    return _derived('gDE', (float(gamma), float(lamda)), params)[0]
+
+
+def clear_cache():
+    """Emptying the in-memory cache (the on-disk store is kept)"""
+    _derived.cache_clear()
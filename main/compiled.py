@@ -0,0 +1,83 @@
+import functools
+import math
+import os
+
+
+backend = os.environ.get('LGCDM_BACKEND', 'auto')   # 'auto' compiles the integrands when Numba is installed, 'python' never does
+
+
+#--------- COMPILED INTEGRANDS ---------#
+
+# quad calls its integrand once per evaluation point, so with a Python
+# closure the call overhead dominates every integral. When Numba is
+# installed the two integrands of the project are compiled once as C
+# callbacks (scipy.LowLevelCallable), which quad calls without entering
+# Python. The model parameters travel in quad's args, so one compiled
+# function serves every h0, gamma and lambda. LCDM is gDE with Q = 1,
+# i.e. gamma = 0 and lamda = 0.
+#
+# The compiled functions evaluate the same expressions in the same order as
+# the Python integrands of main/models.py, which remain the fallback when
+# Numba is missing or backend is 'python', and which the models that are not
+# special cases of gDE (wCDM, CPL) always use.
+
+
+def set_backend(name):
+    """Selecting the integrand backend, 'auto' or 'python'"""
+    global backend
+    if name not in ('auto', 'python'):
+        raise ValueError("backend must be 'auto' or 'python', not {!r}".format(name))
+    backend = name
+
+
+def _sound_horizon(n, xx):
+    """c_s(z) / H(z), xx = (z, h0, gamma, lamda, c, w_b, w_p, w_m, w_r)"""
+    z, h0, gamma, lamda, c, w_b, w_p, w_m, w_r = xx[0], xx[1], xx[2], xx[3], xx[4], xx[5], xx[6], xx[7], xx[8]
+    y = 1 / (1 - lamda)
+    x = 1 - 3*gamma*(lamda-1)*math.log(1+z)
+    Q = math.copysign(1, x)*abs(x)**y
+    R = (3*w_b) / (4*w_p*(1+z))
+    c_s = c / math.sqrt(3*(1+R))
+    return c_s / (100 * math.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r)*Q))
+
+
+def _distance(n, xx):
+    """c / H(z), xx = (z, h0, gamma, lamda, c, w_b, w_p, w_m, w_r)"""
+    z, h0, gamma, lamda, c, w_m, w_r = xx[0], xx[1], xx[2], xx[3], xx[4], xx[7], xx[8]
+    y = 1 / (1 - lamda)
+    x = 1 - 3*gamma*(lamda-1)*math.log(1+z)
+    Q = math.copysign(1, x)*abs(x)**y
+    return c / (100 * math.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r)*Q))
+
+
+_cfuncs = []
+
+
+@functools.lru_cache(maxsize=None)
+def _kernels():
+    """The compiled integrands by name, None without Numba (compiled on first use, cached on disk)"""
+    try:
+        import numba
+    except ImportError:
+        return None
+    from scipy import LowLevelCallable
+    signature = numba.types.double(numba.types.intc, numba.types.CPointer(numba.types.double))
+    kernels = {}
+    for name, function in (('sound_horizon', _sound_horizon), ('distance', _distance)):
+        compiled = numba.cfunc(signature, cache=True)(function)
+        _cfuncs.append(compiled)   # keeps the machine code behind the pointer alive
+        kernels[name] = LowLevelCallable(compiled.ctypes)
+    return kernels
+
+
+def available():
+    """Whether quad gets compiled integrands"""
+    return backend != 'python' and _kernels() is not None
+
+
+def integrand(python_integrand, kind, h0, params, gamma=0.0, lamda=0.0):
+    """The integrand and args for quad: the compiled kind ('sound_horizon' or 'distance') or the Python one"""
+    if not available():
+        return python_integrand, ()
+    return _kernels()[kind], (float(h0), float(gamma), float(lamda), params.c, params.w_b, params.w_p,
+                              params.w_m, params.w_r)
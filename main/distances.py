@@ -0,0 +1,88 @@
+import numpy as np
+
+from main import instrument
+
+
+c = 299792.458   # speed of light in [km/s]
+
+quad_rtol = 1.49e-8   # default relative tolerance of scipy.integrate.quad
+gauss_order = 8   # number of Gauss-Legendre nodes per panel
+max_depth = 40   # maximum number of panel bisections
+max_panels = 1 << 16   # maximum number of panels refined at once
+
+
+#--------- CUMULATIVE INTEGRATION OF c/H(z) ---------#
+
+# Instead of integrating from 0 to every requested redshift separately, the
+# sorted redshifts are used as panel edges, each panel is integrated with
+# Gauss-Legendre nodes (bisected until two successive estimates agree to
+# rtol) and the panel integrals are summed cumulatively. All panels of one
+# refinement level are evaluated in a single vectorized call of the integrand.
+# A panel never converges if the integrand is not finite on it, so the
+# refinement also stops once it would exceed max_panels.
+
+
+def _gauss_panels(integrand, lower, upper):
+    """Gauss-Legendre estimates of the integrand over each panel [lower, upper]"""
+    nodes, weights = np.polynomial.legendre.leggauss(gauss_order)
+    half = (upper - lower) / 2
+    x = (lower + half)[:, None] + half[:, None]*nodes
+    return half * (integrand(x) @ weights)
+
+
+def cumulative_integral(integrand, edges, rtol=quad_rtol):
+    """Integrals of a vectorized integrand from edges[0] to every element of the sorted edges"""
+    if not np.isfinite(edges).all():
+        raise ValueError('the integration edges must be finite')
+    lower, upper = edges[:-1], edges[1:]
+    owner = np.arange(len(lower))
+    panels = np.zeros(len(lower))
+    whole = _gauss_panels(integrand, lower, upper)
+    if instrument.enabled:
+        instrument.record(neval=gauss_order*len(lower))
+    for i in range(max_depth):
+        middle = (lower + upper) / 2
+        left = _gauss_panels(integrand, lower, middle)
+        right = _gauss_panels(integrand, middle, upper)
+        accepted = np.abs(left + right - whole) <= rtol*np.abs(left + right)
+        if i == max_depth - 1 or 2*np.count_nonzero(~accepted) > max_panels:
+            accepted[:] = True
+        np.add.at(panels, owner[accepted], (left + right)[accepted])
+        refine = ~accepted
+        if instrument.enabled:
+            instrument.record(neval=2*gauss_order*len(lower), subdivisions=len(lower))
+        if not refine.any():
+            break
+        lower, upper = (np.concatenate((lower[refine], middle[refine])),
+                        np.concatenate((middle[refine], upper[refine])))
+        whole = np.concatenate((left[refine], right[refine]))
+        owner = np.concatenate((owner[refine], owner[refine]))
+    return np.concatenate(([0.0], np.cumsum(panels)))
+
+
+#--------- D_M, D_H, D_V and D_L ---------#
+
+def distance_table(hubble, z, rtol=quad_rtol, c=c, breaks=()):
+    """Finding D_M(z), D_H(z), D_V(z) and D_L(z) for all z in one pass
+
+    hubble is a vectorized H(z) in [km/s/Mpc]; z may be any array of finite
+    non-negative redshifts in any order and the distances keep its shape.
+    rtol plays the role of the relative tolerance of quad, c is the speed
+    of light in [km/s]. breaks are redshifts where H(z) is not smooth (the
+    z_dagger of gDE), they become panel edges so no panel straddles them.
+    """
+    z = np.asarray(z, dtype=float)
+    if not np.isfinite(z).all():
+        raise ValueError('redshifts must be finite')
+    if np.any(z < 0):
+        raise ValueError('redshifts must be non-negative')
+    z_sorted, position = np.unique(z.ravel(), return_inverse=True)
+    breaks = np.ravel(breaks).astype(float)
+    breaks = breaks[(breaks > 0) & (breaks < z_sorted[-1])] if z_sorted.size else breaks[:0]
+    edges = np.unique(np.concatenate(([0.0], z_sorted, breaks)))
+    integrals = cumulative_integral(lambda x: c / hubble(x), edges, rtol)
+    d_M = integrals[np.searchsorted(edges, z_sorted)][position].reshape(z.shape)
+    d_H = c / hubble(z)
+    d_V = np.cbrt(z * d_M**2 * d_H)
+    d_L = (1 + z) * d_M
+    return d_M, d_H, d_V, d_L
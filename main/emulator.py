@@ -0,0 +1,124 @@
+import functools
+
+import numpy as np
+
+from main.cache import derived_gDE, derived_names
+from main.grid_scan import evaluate_points, scan_grid
+from main.models import gDE
+from main.params import planck18
+
+
+table_path = 'data/gde_table.npz'   # default location of the tabulated solutions
+
+
+#--------- BUILDING THE TABLE ---------#
+
+# h0, r_s, r_d and d_A(z_*) are smooth in (gamma, lambda), so they are solved
+# once on a dense grid over the prior box and served by spline interpolation.
+# The error bound stored with the table is the largest deviation of the
+# splines from the exact solver at the centres of a subset of the grid
+# cells, i.e. as far from the nodes as a query can get. Nodes where the h0
+# solve did not converge (no root inside the prior, e.g. the corner
+# gamma = -0.018, lambda = -24) hold a clamped h0 the splines cannot follow,
+# so the cells touching them are marked and always served by the exact
+# solver; they are left out of the error bound.
+
+
+def _derived_point(gamma, lamda, params=planck18):
+    derived = derived_gDE(gamma, lamda, params)
+    return tuple(derived[name] for name in derived_names)
+
+
+def _solved_point(gamma, lamda, params=planck18):
+    """h0, r_s, r_d, d_A(z_*) and whether the h0 solve converged (as 1.0 or 0.0)"""
+    h0, info = gDE.hubble_finder(gamma, lamda, full_output=True, params=params)
+    return (h0, gDE.r_s(h0, gamma, lamda, params=params), gDE.r_d(h0, gamma, lamda, params=params),
+            gDE.d_A(h0, gamma, lamda, params=params), float(info['converged']))
+
+
+def _exact_cells(converged):
+    """Mask of the grid cells with a non-converged node among their corners
+
+    converged is the (n_gamma, n_lambda) mask of the nodes, the cells are
+    (n_gamma - 1, n_lambda - 1).
+    """
+    failed = ~converged
+    return failed[:-1, :-1] | failed[1:, :-1] | failed[:-1, 1:] | failed[1:, 1:]
+
+
+def _cells(axis, values):
+    """Index of the grid cell along axis containing each value"""
+    return np.clip(np.searchsorted(axis, values, side='right') - 1, 0, len(axis) - 2)
+
+
+def _splines(gamma_values, lamda_values, values, order):
+    from scipy.interpolate import RectBivariateSpline
+    return [RectBivariateSpline(gamma_values, lamda_values, values[:, :, k].T, kx=order, ky=order)
+            for k in range(len(derived_names))]
+
+
+def build_table(path=table_path, shape=(69, 81), gamma_range=(-0.018, -0.001), lamda_range=(-24, -4),
+                order=5, check_stride=4, processes=None, store=None, params=planck18):
+    """Tabulating h0, r_s, r_d and d_A(z_*) on a shape = (n_gamma, n_lambda) grid
+
+    gamma_range and lamda_range are given in increasing order. The centres
+    of every check_stride-th cell are solved as well to measure the
+    interpolation error. store is an optional grid store making the (long)
+    scan resumable.
+    """
+    gamma_values = np.linspace(*gamma_range, shape[0])
+    lamda_values = np.linspace(*lamda_range, shape[1])
+    solve = functools.partial(_solved_point, params=params)
+    X, Y, Z = scan_grid(solve, gamma_values, lamda_values, processes, store=store, params=params)
+    values, converged = Z[:, :, :len(derived_names)], Z[:, :, -1].T.astype(bool)
+    exact_cells = _exact_cells(converged)
+
+    gamma_check = ((gamma_values[:-1] + gamma_values[1:]) / 2)[::check_stride]
+    lamda_check = ((lamda_values[:-1] + lamda_values[1:]) / 2)[::check_stride]
+    G, L = np.meshgrid(gamma_check, lamda_check)
+    g, l = G.ravel(), L.ravel()
+    served = ~exact_cells[_cells(gamma_values, g), _cells(lamda_values, l)]
+    exact = np.array(evaluate_points(solve, zip(g[served], l[served]), processes)).reshape(-1, Z.shape[-1])
+    splines = _splines(gamma_values, lamda_values, values, order)
+    error = np.array([np.max(np.abs(spline.ev(g[served], l[served]) - exact[:, k]), initial=0)
+                      for k, spline in enumerate(splines)])
+
+    np.savez_compressed(path, gamma=gamma_values, lamda=lamda_values, values=values, converged=converged,
+                        error=error, order=order, params=params.values())
+
+
+#--------- QUERYING THE TABLE ---------#
+
+class Emulator:
+    """Spline interpolation of a table written by build_table
+
+    Queries outside the tabulated box or in a cell touching a node whose
+    h0 solve did not converge are passed to the exact (cached) solver.
+    error holds the measured interpolation error of each quantity.
+    """
+
+    def __init__(self, path=table_path, params=planck18):
+        table = np.load(path)
+        if not np.array_equal(table['params'], params.values()):
+            raise ValueError('{} was built for different cosmological parameters'.format(path))
+        if 'converged' not in table.files:
+            raise ValueError('{} was built without convergence flags, rebuild it with build_table'.format(path))
+        self.params = params
+        self.gamma, self.lamda = table['gamma'], table['lamda']
+        self.exact_cells = _exact_cells(table['converged'])
+        self.error = dict(zip(derived_names, table['error']))
+        self.splines = _splines(self.gamma, self.lamda, table['values'], int(table['order']))
+
+    def derived(self, gamma, lamda):
+        """h0, r_s, r_d and d_A(z_*) for arrays of gamma and lamda"""
+        gamma, lamda = np.broadcast_arrays(np.asarray(gamma, dtype=float), np.asarray(lamda, dtype=float))
+        g, l = gamma.ravel(), lamda.ravel()
+        values = np.array([spline.ev(g, l) for spline in self.splines])
+        outside = (g < self.gamma[0]) | (g > self.gamma[-1]) | (l < self.lamda[0]) | (l > self.lamda[-1])
+        outside |= self.exact_cells[_cells(self.gamma, g), _cells(self.lamda, l)]
+        for k in np.flatnonzero(outside):
+            values[:, k] = _derived_point(g[k], l[k], self.params)
+        return dict(zip(derived_names, values.reshape((-1,) + gamma.shape)))
+
+    def h0(self, gamma, lamda):
+        return self.derived(gamma, lamda)['h0']
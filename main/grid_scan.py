@@ -0,0 +1,181 @@
+import functools
+import json
+import multiprocessing
+import os
+import sys
+
+import numpy as np
+
+from main import instrument
+from main.params import planck18
+
+
+store_version = 2   # format of the grid stores, raised when the stored values of a function change
+
+
+#--------- EVALUATING INDEPENDENT PARAMETER POINTS ---------#
+
+# Points are sent to the workers in chunks and collected with imap, so the
+# results always come back in the order of the points regardless of which
+# worker finished first. func has to be picklable, i.e. a module-level
+# function such as hubble_finder_gDE or Omega_m0.
+
+
+def _call(func, point, profile=False):
+    if not profile:
+        return func(*point)
+    with instrument.profiling() as counters:
+        value = func(*point)
+    return value, counters
+
+
+def _report(done, total):
+    sys.stderr.write('\r{} / {} points'.format(done, total))
+    if done == total:
+        sys.stderr.write('\n')
+    sys.stderr.flush()
+
+
+def iterate_points(func, points, processes=None, chunksize=None, progress=False, profile=None):
+    """Yielding func(*point) for every point, in order, computed over a process pool
+
+    profile is an optional instrument.Profile collecting the counters of
+    every point from the workers.
+    """
+    points = list(points)
+    processes = processes or os.cpu_count()
+    if chunksize is None:
+        chunksize = max(1, len(points) // (4*processes))
+    task = functools.partial(_call, func, profile=profile is not None)
+    if processes == 1:
+        values = map(task, points)
+    else:
+        pool = multiprocessing.Pool(processes)
+        values = pool.imap(task, points, chunksize)
+    try:
+        for done, value in enumerate(values, 1):
+            if profile is not None:
+                value, counters = value
+                profile.add(points[done - 1], counters)
+            yield value
+            if progress and (done % chunksize == 0 or done == len(points)):
+                _report(done, len(points))
+    finally:
+        if processes != 1:
+            pool.terminate()
+
+
+def evaluate_points(func, points, processes=None, chunksize=None, progress=False, profile=None):
+    """Evaluating func(*point) for every point over a process pool, in order"""
+    return list(iterate_points(func, points, processes, chunksize, progress, profile))
+
+
+#--------- CHECKPOINTED GRID STORE ---------#
+
+# A grid store is a directory holding the gamma and lambda axes, the values as
+# a memory-mapped .npy array and a done-mask of the same grid shape. Scans
+# write every result into it as soon as it arrives, so a crashed or timed out
+# scan is resumed by computing only the points that are not marked done, and
+# plotting scripts can read a finished scan with load_grid. store.json records
+# the function, the cosmological parameters and store_version, so a store
+# written by another function, parameter set or older code is never resumed.
+
+
+def _function_name(func):
+    """Qualified name of func (of the wrapped function for functools.partial)"""
+    while isinstance(func, functools.partial):
+        func = func.func
+    return '{}.{}'.format(func.__module__, func.__qualname__)
+
+
+def _open_store(path, gamma_values, lamda_values, func, params):
+    """Opening the done-mask of the store at path, creating the store if needed"""
+    gamma_file, lamda_file, done_file, meta_file = (os.path.join(path, name) for name in
+                                                    ('gamma.npy', 'lamda.npy', 'done.npy', 'store.json'))
+    meta = {'function': _function_name(func), 'params': list(params.values()), 'version': store_version}
+    meta = json.loads(json.dumps(meta))   # as read back from store.json
+    if os.path.exists(done_file):
+        try:
+            with open(meta_file) as handle:
+                stored = json.load(handle)
+        except (FileNotFoundError, json.JSONDecodeError):
+            stored = None
+        if stored != meta:
+            raise ValueError('grid store {} was written by another function, parameter set or version '
+                             '({} instead of {}), delete it to recompute'.format(path, stored, meta))
+        if not (np.array_equal(np.load(gamma_file), gamma_values)
+                and np.array_equal(np.load(lamda_file), lamda_values)):
+            raise ValueError('grid store {} belongs to different gamma/lambda values'.format(path))
+        return np.load(done_file, mmap_mode='r+')
+    os.makedirs(path, exist_ok=True)
+    with open(meta_file, 'w') as handle:
+        json.dump(meta, handle)
+    np.save(gamma_file, gamma_values)
+    np.save(lamda_file, lamda_values)
+    shape = (len(lamda_values), len(gamma_values))
+    return np.lib.format.open_memmap(done_file, mode='w+', dtype=bool, shape=shape)
+
+
+def _open_values(path, shape):
+    """Opening the values of the store at path, creating them with the given shape if needed"""
+    values_file = os.path.join(path, 'values.npy')
+    if os.path.exists(values_file):
+        return np.load(values_file, mmap_mode='r+')
+    return np.lib.format.open_memmap(values_file, mode='w+', dtype=float, shape=shape)
+
+
+def load_grid(path):
+    """Reading the grid store at path
+
+    Returns X, Y, Z as scan_grid does, plus the done-mask; points that have
+    not been computed yet are NaN in Z.
+    """
+    gamma_values = np.load(os.path.join(path, 'gamma.npy'))
+    lamda_values = np.load(os.path.join(path, 'lamda.npy'))
+    done = np.load(os.path.join(path, 'done.npy'))
+    X, Y = np.meshgrid(gamma_values, lamda_values)
+    values_file = os.path.join(path, 'values.npy')
+    if os.path.exists(values_file):
+        Z = np.load(values_file)
+    else:
+        Z = np.zeros(X.shape)
+    Z[~done] = np.nan
+    return X, Y, Z, done
+
+
+#--------- SCANNING A (gamma, lambda) GRID ---------#
+
+def scan_grid(func, gamma_values, lamda_values, processes=None, chunksize=None, progress=True,
+              store=None, profile=None, params=planck18):
+    """Evaluating func(gamma, lamda) on the grid spanned by gamma_values and lamda_values
+
+    Returns X, Y, Z as used by contourf: X and Y are the meshgrid of the
+    gamma and lambda values and Z[j, i] = func(gamma_values[i], lamda_values[j])
+    (with trailing axes if func returns several values). If store names a
+    grid store directory, results are checkpointed there and points already
+    done in an earlier run are not recomputed; params are the cosmological
+    parameters func uses, which the store is tied to. profile is an optional
+    instrument.Profile collecting the counters of the computed points.
+    Scripts using a process pool must run the scan under
+    if __name__ == '__main__'.
+    """
+    X, Y = np.meshgrid(gamma_values, lamda_values)
+    if store is None:
+        values = evaluate_points(func, zip(X.ravel(), Y.ravel()), processes, chunksize, progress, profile)
+        Z = np.reshape(values, X.shape + np.shape(values[0]))
+        return X, Y, Z
+
+    done = _open_store(store, gamma_values, lamda_values, func, params)
+    pending = np.flatnonzero(~done.ravel())
+    points = zip(X.ravel()[pending], Y.ravel()[pending])
+    values = None
+    for i, value in enumerate(iterate_points(func, points, processes, chunksize, progress, profile)):
+        k = pending[i]
+        if values is None:
+            values = _open_values(store, X.shape + np.shape(value))
+        index = np.unravel_index(k, X.shape)
+        values[index] = value
+        values.flush()
+        done[index] = True
+        done.flush()
+    return load_grid(store)[:3]
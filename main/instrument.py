@@ -0,0 +1,184 @@
+import contextlib
+import copy
+import functools
+import json
+import os
+import time
+import warnings
+
+
+enabled = bool(os.environ.get('LGCDM_PROFILE'))   # profiling is opt-in (or set LGCDM_PROFILE=1)
+
+# counters kept for every instrumented function: calls and time of the function,
+# quad calls and the ones that warned, fixed-node integrals, integrand
+# evaluations, subdivided intervals (quad) or panels (distance tables), and
+# root finding iterations (summed over the points for batches)
+fields = ('calls', 'time', 'quad_calls', 'quad_warnings', 'fixed_node_calls', 'neval',
+          'subdivisions', 'iterations')
+
+
+#--------- COUNTERS ---------#
+
+# Counters are kept per instrumented function in a plain dict, so a snapshot
+# can be pickled back from a worker process and merged with the others.
+# Integrals and solver iterations are attributed to the innermost profiled
+# function that is running (gDE.r_s, theta_solver, ...). Times are
+# inclusive, e.g. the time of hubble_finder_gDE contains that of its theta
+# evaluations. When profiling is disabled every hook costs a single check.
+
+_counters = {}
+_running = []
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """Zeroing all counters"""
+    _counters.clear()
+
+
+def _entry(name):
+    return _counters.setdefault(name, dict.fromkeys(fields, 0))
+
+
+def record(**counts):
+    """Adding counts (see fields) to the innermost running profiled function"""
+    entry = _entry(_running[-1] if _running else '<top level>')
+    for field, count in counts.items():
+        entry[field] += count
+
+
+def profiled(func, name=None):
+    """Decorator counting the calls and time of func while profiling is enabled
+
+    The counters are kept under name, module.function by default.
+    """
+    name = name or '{}.{}'.format(func.__module__.rsplit('.', 1)[-1], func.__name__)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        _running.append(name)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _running.pop()
+            entry = _entry(name)
+            entry['calls'] += 1
+            entry['time'] += time.perf_counter() - start
+    return wrapper
+
+
+def quad(func, a, b, **kwargs):
+    """scipy.integrate.quad, counting calls, integrand evaluations and subdivisions while profiling"""
+    # SciPy is imported on the first integral, not with the model modules
+    from scipy.integrate import IntegrationWarning, quad as scipy_quad
+    if not enabled:
+        return scipy_quad(func, a, b, **kwargs)
+    result = scipy_quad(func, a, b, full_output=1, **kwargs)
+    info = result[2]
+    record(quad_calls=1, neval=info['neval'], subdivisions=info['last'], quad_warnings=len(result) > 3)
+    if len(result) > 3:
+        warnings.warn(result[3], IntegrationWarning, stacklevel=2)
+    return result[:2]
+
+
+#--------- SNAPSHOTS AND REPORTS ---------#
+
+def snapshot():
+    """Copy of the current counters, {function name: {field: count}}"""
+    return copy.deepcopy(_counters)
+
+
+def merge(*snapshots):
+    """Sum of several snapshots, e.g. of the points of a grid scan"""
+    total = {}
+    for counters in snapshots:
+        for name, entry in counters.items():
+            merged = total.setdefault(name, dict.fromkeys(fields, 0))
+            for field in fields:
+                merged[field] += entry.get(field, 0)
+    return total
+
+
+@contextlib.contextmanager
+def profiling():
+    """Profiling the with block, yields a dict that holds its counters once the block ends
+
+    The counters of the block are also added to the ones already running.
+    """
+    global enabled
+    previous, enabled = enabled, True
+    saved = snapshot()
+    reset()
+    collected = {}
+    try:
+        yield collected
+    finally:
+        enabled = previous
+        collected.update(snapshot())
+        reset()
+        _counters.update(merge(saved, collected))
+
+
+def report(counters=None, path=None):
+    """Table of the counters (the current ones by default), also written to path if given
+
+    A path ending in .json gets the counters themselves instead of the table.
+    """
+    counters = snapshot() if counters is None else counters
+    header = '{:32}'.format('function') + ''.join(' {:>16}'.format(field) for field in fields)
+    lines = [header, '-'*len(header)]
+    for name, entry in sorted(counters.items(), key=lambda item: -item[1]['time']):
+        lines.append('{:32}'.format(name) + ''.join(
+            ' {:16.4f}'.format(entry[field]) if field == 'time' else ' {:16d}'.format(int(entry[field]))
+            for field in fields))
+    table = '\n'.join(lines)
+    if path is not None:
+        with open(path, 'w') as handle:
+            if path.endswith('.json'):
+                json.dump(counters, handle, indent=1)
+            else:
+                handle.write(table + '\n')
+    return table
+
+
+#--------- PROFILING A SCAN ---------#
+
+class Profile:
+    """Counters of a scan, merged over all points and kept per point
+
+    Pass an instance as profile= to iterate_points, evaluate_points or
+    scan_grid; the workers send back the counters of every point with its
+    value. total holds the merged counters, points maps every point to its
+    counts summed over functions (and its time), so worst() finds the
+    expensive or badly behaved regions of parameter space.
+    """
+
+    def __init__(self):
+        self.total = {}
+        self.points = {}
+
+    def add(self, point, counters):
+        self.total = merge(self.total, counters)
+        summary = merge(*({'point': entry} for entry in counters.values())).get('point', dict.fromkeys(fields, 0))
+        # times are inclusive, the outermost function took the whole time of the point
+        summary['time'] = max((entry['time'] for entry in counters.values()), default=0)
+        self.points[tuple(float(p) for p in point)] = summary
+
+    def worst(self, field='neval', n=10):
+        """The n points with the largest sum of field, as (point, count) pairs"""
+        ranked = sorted(self.points.items(), key=lambda item: -item[1][field])
+        return [(point, counts[field]) for point, counts in ranked[:n]]
+
+    def report(self, path=None):
+        return report(self.total, path)
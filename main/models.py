@@ -0,0 +1,234 @@
+import numpy as np
+
+from main import compiled
+from main.distances import distance_table, quad_rtol
+from main.instrument import profiled, quad
+from main.params import planck18
+from main.quadrature import comoving_distance_gauss, sound_horizon_gauss
+from main.solver import theta_batch_solver, theta_solver
+
+
+#--------- DARK ENERGY MODELS ---------#
+
+# Every model of the project is flat LCDM with the cosmological constant
+# replaced by a dark energy whose density ratio Q(z) = rho_de(z) / rho_de,0
+# depends on the model parameters (a point of parameter space):
+#     H(z) = 100 sqrt(w_m (1+z)^3 + w_r (1+z)^4 + (h0^2 - w_m - w_r) Q(z))
+# A DarkEnergyModel is built from Q alone and provides the sound horizons,
+# distances, h0 solves and distance tables, with their fast (fixed-node) and
+# compiled paths, so that every model shares the same kernels. The models
+# are registered by name in models, see get_model.
+#
+# Q(z, *point) must broadcast z against the parameters, which are floats or
+# NumPy arrays (the quad integrands call it once per node with floats, so it
+# should not convert its arguments itself). kink(*point) is the
+# redshift where Q is not smooth (z_dagger of gDE), which the integrators
+# split at, and compiled(*point) maps the point to the (gamma, lamda) of the
+# compiled gDE integrands of main/compiled.py when the model is a special
+# case of gDE; other models integrate their Python integrands.
+
+
+profiled_kernels = ('r_s', 'r_d', 'd_A', 'theta', 'hubble_finder', 'hubble_batch', 'd_M', 'distance_table')
+
+
+def _node_axis(*arrays):
+    """Appending the trailing axis the quadrature nodes run along"""
+    return [np.asarray(a)[..., None] for a in arrays]
+
+
+class DarkEnergyModel:
+    """Flat cosmology with matter, radiation and the dark energy density ratio Q(z, *point)"""
+
+    def __init__(self, name, Q, parameters=(), kink=None, compiled=None):
+        self.name, self.Q, self.parameters = name, Q, tuple(parameters)
+        self._kink, self._compiled = kink, compiled
+        # profiled per model, e.g. gDE.r_s and LCDM.r_s
+        for kernel in profiled_kernels:
+            setattr(self, kernel, profiled(getattr(self, kernel), '{}.{}'.format(name, kernel)))
+
+    def __repr__(self):
+        return 'DarkEnergyModel({!r}, parameters={})'.format(self.name, self.parameters)
+
+    def __reduce__(self):
+        # registered models are sent to worker processes by name
+        return get_model, (self.name,)
+
+    def kink(self, *point):
+        """Redshift where Q(z) is not smooth, None if there is none"""
+        return None if self._kink is None else self._kink(*point)
+
+    #--------- H(z) AND E(z) ---------#
+
+    def hubble(self, z, h0, *point, params=planck18):
+        """Hubble function H(z), broadcasting z, h0 and the parameters against each other"""
+        w_m, w_r = params.w_m, params.w_r
+        z, h0, point = np.asarray(z), np.asarray(h0), [np.asarray(p) for p in point]
+        return 100 * np.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r) * self.Q(z, *point))
+
+    def E(self, z, h0, *point, params=planck18):
+        """E(z) function"""
+        z, h0, point = np.asarray(z), np.asarray(h0), [np.asarray(p) for p in point]
+        Omega_m = params.w_m / h0**2
+        Omega_r = params.w_r / h0**2
+        return np.sqrt(Omega_m*(1+z)**3 + Omega_r*(1+z)**4 + (1-Omega_m-Omega_r)*self.Q(z, *point))
+
+    #--------- QUAD INTEGRALS ---------#
+
+    def _quad(self, kind, lower, upper, h0, point, params):
+        """quad of c_s/H (kind 'sound_horizon') or c/H ('distance') from lower to upper (may be np.inf)
+
+        A finite interval is split at the kink of Q, which quad then handles
+        as an endpoint instead of bisecting around it. The sound horizon
+        integrals to infinity are not split: above z_* the dark energy term
+        is negligible, and a kink far out in the tail (z_dagger ~ 1e29 for
+        small |gamma|) would leave quad a finite interval too long to sample.
+        """
+        c, w_b, w_p, w_m, w_r = params.c, params.w_b, params.w_p, params.w_m, params.w_r
+        Q, point = self.Q, [float(p) for p in point]
+        if kind == 'sound_horizon':
+            def integrand(z):
+                R = (3*w_b) / (4*w_p*(1+z))
+                c_s = c / np.sqrt(3*(1+R))
+                return c_s / (100 * np.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r)*Q(z, *point)))
+        else:
+            def integrand(z):
+                return c / (100 * np.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r)*Q(z, *point)))
+        if self._compiled is None:
+            func, args = integrand, ()
+        else:
+            func, args = compiled.integrand(integrand, kind, h0, params, *self._compiled(*point))
+        kink = self.kink(*point)
+        if kink is None or np.isinf(upper) or not lower < float(kink) < upper:
+            return quad(func, lower, upper, args=args)[0]
+        kink = float(kink)
+        return quad(func, lower, kink, args=args)[0] + quad(func, kink, upper, args=args)[0]
+
+    #--------- SOUND HORIZONS AND DISTANCES ---------#
+
+    # fast=True replaces quad by the fixed-node rules of main/quadrature.py.
+    # These broadcast over arrays of h0 and of the parameters, so one call
+    # evaluates a whole batch of models (quad only takes scalars).
+
+    def r_s(self, h0, *point, params=planck18, fast=False):
+        """Calculating the comoving sound horizon at the LSS (r_s)"""
+        if fast:
+            nodes = _node_axis(*point)
+            return sound_horizon_gauss(h0, lambda z: self.Q(z, *nodes), params.z_star, params)
+        return self._quad('sound_horizon', params.z_star, np.inf, h0, point, params)
+
+    def r_d(self, h0, *point, params=planck18, fast=False):
+        """Calculating the comoving sound horizon at the BDE (r_d)"""
+        if fast:
+            nodes = _node_axis(*point)
+            return sound_horizon_gauss(h0, lambda z: self.Q(z, *nodes), params.z_d, params)
+        return self._quad('sound_horizon', params.z_d, np.inf, h0, point, params)
+
+    def d_A(self, h0, *point, params=planck18, fast=False):
+        """Calculating the comoving angular diameter distance to the LSS (d_A(z_*))"""
+        if fast:
+            return self.d_M(params.z_star, h0, *point, params=params, fast=fast)
+        return self._quad('distance', 0, params.z_star, h0, point, params)
+
+    def d_M(self, z, h0, *point, params=planck18, fast=False):
+        """Finding D_M(z) (z a scalar for quad, any array with fast=True)"""
+        if fast:
+            h, *nodes = _node_axis(h0, *point)
+            return comoving_distance_gauss(lambda x: self.hubble(x, h, *nodes, params=params), z, params.c,
+                                           self.kink(*point))
+        return self._quad('distance', 0, z, h0, point, params)
+
+    def distance_table(self, z, h0, *point, rtol=quad_rtol, params=planck18):
+        """Finding D_M(z), D_H(z), D_V(z) and D_L(z) for an array of z with one integration"""
+        kink = self.kink(*point)
+        return distance_table(lambda x: self.hubble(x, h0, *point, params=params), z, rtol, params.c,
+                              breaks=() if kink is None else [kink])
+
+    #--------- FINDING THE HUBBLE CONSTANT ---------#
+
+    def theta(self, h0, *point, params=planck18, fast=False):
+        """Calculating the acoustic scale angle theta_* = r_s / d_A(z_*)"""
+        return (self.r_s(h0, *point, params=params, fast=fast)
+                / self.d_A(h0, *point, params=params, fast=fast))
+
+    def hubble_finder(self, *point, h0_guess=None, full_output=False, params=planck18, fast=False):
+        """Finding the Hubble constant
+
+        Solves theta(h0) = theta_true with Brent's method, see theta_solver for
+        the warm start (h0_guess) and the diagnostics returned by full_output.
+        fast=True uses the fixed-node integrals in every theta evaluation.
+        """
+        return theta_solver(lambda h0: self.theta(h0, *point, params=params, fast=fast),
+                            params.theta_true, params.hubble_error, h0_guess, full_output)
+
+    def hubble_batch(self, *point, params=planck18):
+        """Finding the Hubble constant for arrays of the parameters at once
+
+        All points are solved in lock-step on the fixed-node theta (fast=True),
+        see theta_batch_solver. Returns h0 and the per-point convergence flags,
+        both shaped like the parameters broadcast against each other.
+        """
+        shape = np.broadcast_shapes(*(np.shape(t) for t in point))
+        flat = [np.broadcast_to(np.asarray(t, dtype=float), shape).ravel() for t in point]
+        h0, converged = theta_batch_solver(
+            lambda h0, i: self.theta(h0, *(t[i] for t in flat), params=params, fast=True),
+            params.theta_true, params.hubble_error, int(np.prod(shape)))
+        return h0.reshape(shape), converged.reshape(shape)
+
+
+#--------- REGISTRY ---------#
+
+models = {}   # registered models by name
+
+
+def register(model):
+    """Adding model to the registry, returns it"""
+    models[model.name] = model
+    return model
+
+
+def get_model(model):
+    """The registered model of the given name (models themselves are passed through)"""
+    if isinstance(model, DarkEnergyModel):
+        return model
+    try:
+        return models[model]
+    except KeyError:
+        raise ValueError('unknown model {!r}, registered: {}'.format(model, ', '.join(models))) from None
+
+
+#--------- DENSITY RATIOS ---------#
+
+def Q_LCDM(z):
+    """Cosmological constant, Q(z) = 1"""
+    return np.ones_like(z, dtype=float)
+
+
+def Q_gDE(z, gamma, lamda):
+    """Graduated dark energy, Q(z) = sign(x)|x|^(1/(1-lambda)) with x = 1 - 3 gamma (lambda-1) ln(1+z)"""
+    y = 1 / (1 - lamda)
+    x = 1 - 3*gamma*(lamda-1)*np.log(1+z)
+    return np.copysign(1, x) * np.abs(x)**y
+
+
+def z_dagger_gDE(gamma, lamda):
+    """Redshift where x and so Q of gDE cross zero"""
+    gamma, lamda = np.asarray(gamma), np.asarray(lamda)
+    psi = 3*gamma*(lamda-1)
+    return np.exp(1/psi) - 1
+
+
+def Q_wCDM(z, w):
+    """Constant equation of state w, Q(z) = (1+z)^(3(1+w))"""
+    return (1+z)**(3*(1+w))
+
+
+def Q_CPL(z, w0, wa):
+    """Chevallier-Polarski-Linder w(a) = w0 + wa (1-a), Q(z) = (1+z)^(3(1+w0+wa)) exp(-3 wa z/(1+z))"""
+    return (1+z)**(3*(1+w0+wa)) * np.exp(-3*wa*z/(1+z))
+
+
+LCDM = register(DarkEnergyModel('LCDM', Q_LCDM, compiled=lambda: (0.0, 0.0)))
+gDE = register(DarkEnergyModel('gDE', Q_gDE, ('gamma', 'lamda'), kink=z_dagger_gDE,
+                               compiled=lambda gamma, lamda: (gamma, lamda)))
+wCDM = register(DarkEnergyModel('wCDM', Q_wCDM, ('w',)))
+CPL = register(DarkEnergyModel('CPL', Q_CPL, ('w0', 'wa')))
@@ -0,0 +1,77 @@
+from dataclasses import astuple, dataclass
+from functools import cached_property
+
+
+#--------- CALCULATING REDSHIFTS TO LSS and BDE ---------#
+# See https://arxiv.org/pdf/astro-ph/9510117.pdf for further information
+
+
+def z_star_finder(w_b, w_m):
+    """Calculating the redshift to the Last Scattering Surface (LSS)"""
+    g1 = 0.0783*w_b**(-0.238)*(1+39.5*w_b**(0.763))**(-1)
+    g2 = 0.56*(1+21.1*w_b**(1.81))**(-1)
+    z_star = 1048*(1+0.00124*w_b**(-0.738))*(1+g1*w_m**g2)
+    return z_star
+
+
+def z_d_finder(w_b, w_m):
+    """Calculating the redshift to the Baryon Drag Epoch (BDE)"""
+    b1 = 0.313*w_m**(-0.419)*(1+0.607*w_m**(0.674))
+    b2 = 0.238*w_m**(0.223)
+    b3 = w_m**(0.251) / (1+0.659*w_m**(0.828))
+    z_d = 1345*b3*(1+b1*w_b**b2)
+    return z_d
+
+
+#--------- COSMOLOGICAL PARAMETERS ---------#
+
+# One parameter set is passed to every model function (params=...), so
+# several (w_b, w_c, N_eff) settings can be evaluated in the same process.
+# The set is immutable and hashable, which makes it usable as a cache key,
+# and its derived quantities are computed on first use and then kept.
+
+
+@dataclass(frozen=True)
+class CosmoParams:
+    """Physical constants and cosmological parameters shared by the models"""
+    c: float = 299792.458   # speed of light in [km/s]
+    N_eff: float = 3.046   # effective neutrino number
+    w_b: float = 0.022383   # physical baryon density parameter
+    w_c: float = 0.12011   # physical cold dark matter density parameter
+    w_p: float = 2.469 * 10**(-5)   # physical photon density parameter
+    theta_true: float = 0.01040909   # approximation to the acoustic scale angle
+    hubble_error: float = 10**(-8)   # the error while calculating the hubble constant
+
+    @cached_property
+    def w_m(self):
+        """physical matter density parameter"""
+        return self.w_b + self.w_c
+
+    @cached_property
+    def w_n(self):
+        """physical neutrino density parameter"""
+        return self.w_p*(7/8)*(4/11)**(4/3)*self.N_eff
+
+    @cached_property
+    def w_r(self):
+        """physical radiation density parameter"""
+        return self.w_p + self.w_n
+
+    @cached_property
+    def z_star(self):
+        """redshift to the LSS"""
+        return z_star_finder(self.w_b, self.w_m)
+
+    @cached_property
+    def z_d(self):
+        """redshift to the BDE"""
+        return z_d_finder(self.w_b, self.w_m)
+
+    def values(self):
+        """The defining parameters as a tuple (used in cache keys)"""
+        return astuple(self)
+
+
+# These Parameters are taken from https://arxiv.org/pdf/1807.06209.pdf
+# Table I. Upper Panel Plik Best Fit Values
+planck18 = CosmoParams()
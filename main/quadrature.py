@@ -0,0 +1,107 @@
+import functools
+
+import numpy as np
+
+from main import instrument
+
+
+gauss_order = 16   # number of nodes of the fixed Gauss-Legendre rules
+panel_order = 12   # number of nodes per panel of the distance integrals
+base_panels = 4   # number of equal panels in ln(1+z)
+grading_levels = 8   # number of panels refined towards a kink on each side
+grading_ratio = 0.15   # width ratio of successive graded panels
+
+
+@functools.lru_cache(maxsize=None)
+def gauss_legendre(n):
+    """Gauss-Legendre nodes and weights on [-1, 1]"""
+    return np.polynomial.legendre.leggauss(n)
+
+
+def gauss_nodes(lower, upper, n=gauss_order):
+    """Nodes and weights of the n-point rule on [lower, upper], along a new trailing axis"""
+    nodes, weights = gauss_legendre(n)
+    lower, upper = np.asarray(lower)[..., None], np.asarray(upper)[..., None]
+    half = (upper - lower) / 2
+    return lower + half*(nodes + 1), half*weights
+
+
+def graded_nodes(lower, upper, kink=None, n=panel_order, panels=base_panels,
+                 levels=grading_levels, ratio=grading_ratio):
+    """Composite Gauss-Legendre nodes and weights on [lower, upper]
+
+    The interval is cut into equal panels and, if kink is given, into
+    panels shrinking geometrically towards kink from both sides, so the
+    non-smooth point is resolved to ratio**levels of a panel width. Every
+    argument may be an array; the nodes run along a trailing axis and their
+    number is the same for all intervals (panels outside [lower, upper]
+    collapse to zero width).
+    """
+    lower, upper = np.broadcast_arrays(np.asarray(lower, dtype=float)[..., None],
+                                       np.asarray(upper, dtype=float)[..., None])
+    width = (upper - lower) / panels
+    edges = lower + width*np.arange(panels + 1)
+    if kink is not None:
+        kink = np.asarray(kink, dtype=float)[..., None]
+        step = width*ratio**np.arange(levels + 1)
+        shape = np.broadcast_shapes(edges.shape[:-1], kink.shape[:-1])
+        pieces = (edges, kink - step, kink, kink + step)
+        edges = np.concatenate([np.broadcast_to(p, shape + p.shape[-1:]) for p in pieces], axis=-1)
+        edges = np.sort(np.clip(edges, lower, upper), axis=-1)
+    x, w = gauss_nodes(edges[..., :-1], edges[..., 1:], n)
+    return x.reshape(x.shape[:-2] + (-1,)), w.reshape(w.shape[:-2] + (-1,))
+
+
+#--------- SOUND HORIZON ON FIXED NODES ---------#
+
+# Above z_* (or z_d) the universe is radiation and matter dominated. With the
+# substitution a = 1/(1+z) the infinite range becomes (0, 1/(1+z_lower)) and
+#     c_s / H dz = c_s da / (100 sqrt(w_m a + w_r + (h0^2 - w_m - w_r) Q a^4)),
+# which is smooth in a (the dark energy term is suppressed by a^4), so a fixed
+# 16-node Gauss-Legendre rule reproduces quad to ~1e-15 with 16 evaluations
+# of the integrand instead of a few hundred.
+
+
+def sound_horizon_gauss(h0, dark_energy, z_lower, params, n=gauss_order):
+    """Comoving sound horizon from z_lower to infinity, dark_energy(z) being the model's Q(z)
+
+    h0 may be an array; the nodes run along a trailing axis, which
+    dark_energy(z) has to broadcast against for array model parameters.
+    """
+    nodes, weights = gauss_legendre(n)
+    a_upper = 1 / (1 + np.asarray(z_lower)[..., None])
+    a = a_upper * (nodes + 1) / 2
+    h0 = np.asarray(h0)[..., None]
+    R = (3*params.w_b*a) / (4*params.w_p)
+    c_s = params.c / np.sqrt(3*(1+R))
+    Q = dark_energy(1/a - 1)
+    integrand = c_s / (100 * np.sqrt(params.w_m*a + params.w_r + (h0**2-params.w_m-params.w_r)*Q*a**4))
+    if instrument.enabled:
+        instrument.record(fixed_node_calls=1, neval=integrand.size)
+    return (a_upper / 2 * integrand) @ weights
+
+
+#--------- COMOVING DISTANCE ON FIXED NODES ---------#
+
+# Below z_* the integral of c/H is taken in u = ln(1+z), where the matter and
+# radiation terms are smooth exponentials, on the composite nodes of
+# graded_nodes. For gDE the density Q(z) = sign(x)|x|^y has an infinite
+# derivative where it crosses zero (z_dagger), so the panels are graded
+# towards that point. With the defaults this agrees with quad to ~1e-12 at
+# z_* and the same node layout serves a whole array of models in one call.
+
+
+def comoving_distance_gauss(hubble, z, c, z_kink=None, **rule):
+    """Integral of c/H from 0 to z for arrays of z (and model parameters)
+
+    hubble(z) is a vectorized H(z) in [km/s/Mpc] broadcasting against a
+    trailing node axis, c the speed of light in [km/s] and z_kink an optional
+    redshift where the integrand is not smooth; rule overrides the defaults
+    of graded_nodes.
+    """
+    u_kink = None if z_kink is None else np.log1p(z_kink)
+    u, w = graded_nodes(np.zeros(np.shape(z)), np.log1p(z), u_kink, **rule)
+    integrand = c * np.exp(u) / hubble(np.expm1(u))
+    if instrument.enabled:
+        instrument.record(fixed_node_calls=1, neval=integrand.size)
+    return (integrand * w).sum(axis=-1)
@@ -0,0 +1,118 @@
+import multiprocessing
+import sys
+
+import numpy as np
+
+from main.bao_likelihood import BAOLikelihood
+from main.gde_cdm import hubble_finder_gDE
+from main.params import planck18
+from main.sn_likelihood import SNLikelihood
+
+
+# Prior Ranges (see main/gde_cdm.py)
+gamma_prior = (-0.018, -0.001)
+lamda_prior = (-24, -4)
+
+
+#--------- POSTERIOR OF (gamma, lambda) ---------#
+
+# h0 is not sampled: for every (gamma, lambda) it is fixed by the CMB
+# acoustic scale theta_*, i.e. by hubble_finder_gDE. Each walker carries the
+# h0 of its current position, which warm starts the solve at its next
+# proposal, so a step costs a few theta evaluations instead of a full solve.
+
+_likelihoods = {}
+
+
+def _data(params):
+    """SN and BAO likelihoods, loaded once per (worker) process and parameter set"""
+    if params not in _likelihoods:
+        _likelihoods[params] = (SNLikelihood('mb_data.txt', params=params), BAOLikelihood(params=params))
+    return _likelihoods[params]
+
+
+def log_posterior(gamma, lamda, h0_guess=None, params=planck18):
+    """log posterior (flat priors, SN + BAO + CMB theta) and the h0 it implies"""
+    if not (gamma_prior[0] <= gamma <= gamma_prior[1] and lamda_prior[0] <= lamda <= lamda_prior[1]):
+        return -np.inf, np.nan
+    h0, info = hubble_finder_gDE(gamma, lamda, h0_guess, full_output=True, params=params)
+    if not info['converged']:
+        return -np.inf, np.nan
+    sn, bao = _data(params)
+    chi2 = sn.chi2_gDE(gamma, lamda, h0) + bao.chi2_gDE(gamma, lamda, h0)
+    return -chi2/2, h0
+
+
+def _log_posterior_task(args):
+    (gamma, lamda), h0_guess, params = args
+    return log_posterior(gamma, lamda, h0_guess if np.isfinite(h0_guess) else None, params)
+
+
+#--------- AFFINE-INVARIANT ENSEMBLE SAMPLER ---------#
+
+# Stretch move of Goodman & Weare (2010) with the ensemble split in two
+# halves, https://arxiv.org/pdf/1202.3665.pdf: the proposals of one half only
+# depend on the other half, so each half is evaluated as one parallel batch.
+
+
+def run_sampler(n_walkers=32, n_steps=1000, start=(-0.01, -14), scale=(0.001, 1),
+                chain_path='chain.txt', processes=None, stretch=2, seed=None, progress=True,
+                params=planck18):
+    """Sampling the gDE posterior over (gamma, lambda)
+
+    Walkers start in a Gaussian ball of width scale around start. After
+    every step the positions, h0 and log posterior of all walkers are
+    appended to chain_path, so the chain can be read (load_chain) while the
+    run is going. Returns the final positions, their log posterior and the
+    acceptance fraction of every walker.
+    """
+    rng = np.random.default_rng(seed)
+    walkers = np.asarray(start) + np.asarray(scale)*rng.standard_normal((n_walkers, 2))
+    walkers[:, 0] = np.clip(walkers[:, 0], *gamma_prior)
+    walkers[:, 1] = np.clip(walkers[:, 1], *lamda_prior)
+    accepted = np.zeros(n_walkers)
+    halves = (np.arange(0, n_walkers, 2), np.arange(1, n_walkers, 2))
+
+    pool = multiprocessing.Pool(processes) if processes != 1 else None
+    evaluate = pool.map if pool is not None else lambda f, tasks: list(map(f, tasks))
+    try:
+        results = evaluate(_log_posterior_task, zip(walkers, [np.nan]*n_walkers, [params]*n_walkers))
+        log_prob, h0 = map(np.array, zip(*results))
+        with open(chain_path, 'w') as chain:
+            chain.write('# step walker gamma lambda h0 log_posterior\n')
+            for step in range(n_steps):
+                for active, other in (halves, halves[::-1]):
+                    z = ((stretch - 1)*rng.random(len(active)) + 1)**2 / stretch
+                    partners = walkers[rng.choice(other, len(active))]
+                    proposal = partners + z[:, None]*(walkers[active] - partners)
+                    results = evaluate(_log_posterior_task, zip(proposal, h0[active], [params]*len(active)))
+                    new_log_prob, new_h0 = map(np.array, zip(*results))
+                    # acceptance probability z**(n_dim - 1) p(proposal) / p(walker), n_dim = 2
+                    log_ratio = np.log(z) + new_log_prob - log_prob[active]
+                    accept = np.log(rng.random(len(active))) < log_ratio
+                    walkers[active[accept]] = proposal[accept]
+                    log_prob[active[accept]] = new_log_prob[accept]
+                    h0[active[accept]] = new_h0[accept]
+                    accepted[active[accept]] += 1
+                rows = np.column_stack((np.full(n_walkers, step), np.arange(n_walkers), walkers, h0, log_prob))
+                np.savetxt(chain, rows, fmt=['%d', '%d'] + ['%.17g']*4)
+                chain.flush()
+                if progress:
+                    sys.stderr.write('\rstep {} / {}'.format(step + 1, n_steps))
+        if progress:
+            sys.stderr.write('\n')
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return walkers, log_prob, accepted / n_steps
+
+
+def load_chain(path='chain.txt'):
+    """Reading a chain written by run_sampler as an array of shape (steps, walkers, 4)
+
+    The last axis holds gamma, lambda, h0 and the log posterior.
+    """
+    rows = np.loadtxt(path, ndmin=2)
+    n_walkers = int(rows[:, 1].max()) + 1
+    n_steps = len(rows) // n_walkers
+    return rows[:n_steps*n_walkers, 2:].reshape(n_steps, n_walkers, 4)
@@ -0,0 +1,158 @@
+import itertools
+import json
+import os
+import shutil
+
+import numpy as np
+
+from main.models import get_model
+from main.params import planck18
+from main.state import state
+
+
+columns = {'z_cmb': 1, 'z_hel': 2, 'm_b': 4, 'dm_b': 5}   # catalog columns kept and their position in a row
+chunk_rows = 1000000   # rows read, converted or evaluated at a time
+cache_root = os.path.join('data', 'sn_catalogs')   # directory of the converted catalogs
+
+
+#--------- READING THE TEXT CATALOG ---------#
+
+# Catalogs in the mb_data.txt layout (#name zcmb zhel dz mb dmb ...) can have
+# millions of rows, so the text is never loaded whole: it is parsed chunk_rows
+# lines at a time and only the columns above are kept.
+
+
+def read_chunks(path, rows=chunk_rows):
+    """Yielding the kept columns of the text catalog at path as {column: array}, rows lines at a time"""
+    with open(path) as handle:
+        while True:
+            lines = list(itertools.islice(handle, rows))
+            if not lines:
+                return
+            table = np.loadtxt(lines, usecols=tuple(columns.values()), ndmin=2)
+            if len(table):
+                yield dict(zip(columns, table.T))
+
+
+#--------- COLUMNAR BINARY CACHE ---------#
+
+# On the first read the catalog is converted into one .npy file per column
+# (cache_root/<catalog name>/<column>.npy), which np.load then memory-maps, so
+# later runs read only the pages they touch. The row count is only known at
+# the end, so the columns are streamed to raw files first and given their .npy
+# header afterwards. The size and modification time of the text file are
+# stored next to the columns and a changed catalog is converted again.
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'path': os.path.abspath(path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def cache_directory(path, root=cache_root):
+    return os.path.join(root, os.path.splitext(os.path.basename(path))[0])
+
+
+def convert(path, directory=None, rows=chunk_rows):
+    """Converting the text catalog at path into memory-mappable columns, returns their directory"""
+    directory = directory or cache_directory(path)
+    os.makedirs(directory, exist_ok=True)
+    stamp_path = os.path.join(directory, 'source.json')
+    if os.path.exists(stamp_path):
+        os.remove(stamp_path)   # written last, marks a complete conversion
+    raw = {name: open(os.path.join(directory, name + '.raw'), 'wb') for name in columns}
+    size = 0
+    try:
+        for chunk in read_chunks(path, rows):
+            for name, values in chunk.items():
+                raw[name].write(np.ascontiguousarray(values, dtype='<f8').tobytes())
+            size += len(chunk['z_cmb'])
+    finally:
+        for handle in raw.values():
+            handle.close()
+    header = {'descr': '<f8', 'fortran_order': False, 'shape': (size,)}
+    for name in columns:
+        raw_path = os.path.join(directory, name + '.raw')
+        with open(raw_path, 'rb') as source, open(os.path.join(directory, name + '.npy'), 'wb') as target:
+            np.lib.format.write_array_header_2_0(target, header)
+            shutil.copyfileobj(source, target)
+        os.remove(raw_path)
+    with open(stamp_path, 'w') as handle:
+        json.dump(dict(_source_stamp(path), rows=size), handle)
+    return directory
+
+
+def _is_current(path, directory):
+    try:
+        with open(os.path.join(directory, 'source.json')) as handle:
+            stamp = json.load(handle)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return False
+    return (all(stamp.get(key) == value for key, value in _source_stamp(path).items())
+            and all(os.path.exists(os.path.join(directory, name + '.npy')) for name in columns))
+
+
+#--------- SUPERNOVA CATALOG ---------#
+
+class SNCatalog:
+    """Memory-mapped supernova catalog in the mb_data.txt column layout
+
+    The text file is converted on first use (see convert) and the columns
+    z_cmb, z_hel, m_b and dm_b are read-only memory maps afterwards. The
+    distance moduli and M_B = m_B - mu(z) are evaluated rows at a time, so
+    memory stays bounded by the chunk size whatever the catalog size.
+    For the full-covariance chi^2 of small catalogs use SNLikelihood.
+    """
+
+    def __init__(self, path='mb_data.txt', directory=None, rows=chunk_rows):
+        self.path, self.rows = path, rows
+        self.directory = directory or cache_directory(path)
+        if not _is_current(path, self.directory):
+            convert(path, self.directory, rows)
+        for name in columns:
+            setattr(self, name, np.load(os.path.join(self.directory, name + '.npy'), mmap_mode='r'))
+
+    def __len__(self):
+        return len(self.z_cmb)
+
+    def chunks(self):
+        """Yielding (slice, {column: array}) over the catalog, rows at a time"""
+        for start in range(0, len(self), self.rows):
+            rows = slice(start, start + self.rows)
+            yield rows, {name: np.asarray(getattr(self, name)[rows]) for name in columns}
+
+    #--------- DISTANCE MODULI AND M_B ---------#
+
+    def _moduli(self, model, point, params):
+        """Yielding (slice, chunk, mu) with one distance table per chunk, h0 from the shared state of the point"""
+        h0 = state(model, *point, params=params).h0
+        model = get_model(model)
+        for rows, chunk in self.chunks():
+            d_M = model.distance_table(chunk['z_cmb'], h0, *point, params=params)[0]
+            yield rows, chunk, 5*np.log10((1 + chunk['z_hel']) * d_M) + 25
+
+    def distance_modulus(self, model='LCDM', point=(), params=planck18, out=None):
+        """mu = 5 log10(D_L / Mpc) + 25 of every supernova for a registered model (main/models.py) at point
+
+        out is an optional array (e.g. a np.lib.format.open_memmap) the values
+        are written into, a new array by default.
+        """
+        out = np.empty(len(self)) if out is None else out
+        for rows, chunk, mu in self._moduli(model, point, params):
+            out[rows] = mu
+        return out
+
+    def M_B(self, model='LCDM', point=(), params=planck18, out=None):
+        """M_B = m_B - mu(z) of every supernova and their inverse-variance weighted mean
+
+        The mean only uses the statistical errors dm_b; out works as in
+        distance_modulus.
+        """
+        out = np.empty(len(self)) if out is None else out
+        weighted, total = 0.0, 0.0
+        for rows, chunk, mu in self._moduli(model, point, params):
+            out[rows] = chunk['m_b'] - mu
+            weights = chunk['dm_b']**-2
+            weighted += weights @ out[rows]
+            total += weights.sum()
+        return out, weighted / total
@@ -0,0 +1,89 @@
+import numpy as np
+
+from main.models import get_model
+from main.params import planck18
+from main.state import state
+
+
+#--------- PANTHEON SUPERNOVA LIKELIHOOD ---------#
+
+# chi^2 of the apparent magnitudes m_B with the absolute magnitude M_B
+# marginalized analytically (Conley et al. 2011, https://arxiv.org/pdf/1104.1443.pdf):
+#     chi^2 = A - B^2 / C,  A = r^T C^-1 r,  B = sum(C^-1 r),  C = sum(C^-1)
+# with r = m_B - mu(z). The inverse covariance and its sums are computed once
+# when the data are loaded, and the distance moduli of all supernovae come
+# from a single cumulative distance table, so an evaluation only costs one
+# table plus a few dot products.
+
+
+def load_covariance(path):
+    """Reading a Pantheon systematics file (N on the first line, then the N*N entries)"""
+    entries = np.loadtxt(path).ravel()
+    n = int(entries[0])
+    return entries[1:].reshape(n, n)
+
+
+class SNLikelihood:
+    """Supernova likelihood for files in the mb_data.txt column layout
+
+    cov is an optional systematic covariance matrix (array or path to a
+    Pantheon systematics file); the statistical errors dmb are always added
+    to its diagonal. params is the cosmological parameter set of the models.
+    """
+
+    def __init__(self, path='mb_data.txt', cov=None, params=planck18):
+        self.params = params
+        self.z_cmb, self.z_hel, self.m_b, self.dm_b = np.loadtxt(path, usecols=(1, 2, 4, 5),
+                                                                 unpack=True, ndmin=2)
+        covariance = np.diag(self.dm_b**2)
+        if isinstance(cov, str):
+            covariance += load_covariance(cov)
+        elif cov is not None:
+            covariance += np.asarray(cov)
+        self.inv_cov = np.linalg.inv(covariance)
+        self.inv_cov_sums = self.inv_cov.sum(axis=0)
+        self.inv_cov_total = self.inv_cov_sums.sum()
+
+    #--------- DISTANCE MODULI ---------#
+
+    def distance_modulus(self, d_M):
+        """mu = 5 log10(D_L / Mpc) + 25 from D_M(z_cmb) of every supernova"""
+        return 5*np.log10((1 + self.z_hel) * d_M) + 25
+
+    # Any registered model (main/models.py) by name and parameter point.
+    # Without an explicit h0 the distances come from the shared state of the
+    # point (main/state.py), so they are integrated once per point.
+
+    def distance_modulus_model(self, model, *point, h0=None):
+        if h0 is None:
+            return self.distance_modulus(state(model, *point, params=self.params).d_M(self.z_cmb))
+        d_M = get_model(model).distance_table(self.z_cmb, h0, *point, params=self.params)[0]
+        return self.distance_modulus(d_M)
+
+    def distance_modulus_LCDM(self, h0=None):
+        return self.distance_modulus_model('LCDM', h0=h0)
+
+    def distance_modulus_gDE(self, gamma, lamda, h0=None):
+        return self.distance_modulus_model('gDE', gamma, lamda, h0=h0)
+
+    #--------- CHI-SQUARE ---------#
+
+    def chi2(self, mu):
+        """chi^2 of the distance moduli mu, marginalized over M_B"""
+        residual = self.m_b - mu
+        A = residual @ self.inv_cov @ residual
+        B = self.inv_cov_sums @ residual
+        return A - B**2 / self.inv_cov_total
+
+    def M_B(self, mu):
+        """Best-fit absolute magnitude for the distance moduli mu"""
+        return self.inv_cov_sums @ (self.m_b - mu) / self.inv_cov_total
+
+    def chi2_model(self, model, *point, h0=None):
+        return self.chi2(self.distance_modulus_model(model, *point, h0=h0))
+
+    def chi2_LCDM(self, h0=None):
+        return self.chi2(self.distance_modulus_LCDM(h0))
+
+    def chi2_gDE(self, gamma, lamda, h0=None):
+        return self.chi2(self.distance_modulus_gDE(gamma, lamda, h0))
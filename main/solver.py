@@ -0,0 +1,135 @@
+import numpy as np
+
+from main import instrument
+from main.instrument import profiled
+
+
+h_min, h_max = 0.4, 1   # h_0 prior range
+bracket_step = 0.005   # initial half-width of the bracket around a warm start
+
+
+#--------- SOLVING theta(h0) = theta_true ---------#
+
+# theta(h0) is smooth and monotonic in h0, so Brent's method converges in a
+# handful of steps where the bisection needed ~20 (two quad integrals each).
+# Every theta evaluation is memoized so that the bracketing and Brent's
+# method never integrate the same h0 twice. A warm start h0_guess is clamped
+# to the prior and a non-finite one is ignored, so theta is only ever
+# evaluated inside [h_min, h_max]. Where theta(h0) = theta_true has no root
+# in the prior (the corner gamma = -0.018, lambda = -24 of gDE) the closer
+# end of the prior is returned, flagged as not converged.
+
+
+def _warm_bracket(f, h0_guess):
+    """Expanding bracket [a, b] around h0_guess containing the root of f"""
+    step = bracket_step
+    while True:
+        a, b = max(h0_guess - step, h_min), min(h0_guess + step, h_max)
+        if f(a) * f(b) <= 0 or (a == h_min and b == h_max):
+            return a, b
+        step *= 4
+
+
+@profiled
+def theta_solver(theta, theta_true, hubble_error, h0_guess=None, full_output=False):
+    """Finding h0 such that theta(h0) = theta_true
+
+    h0 is converged to within hubble_error (since dtheta/dh0 < 1 this also
+    bounds |theta_true - theta(h0)|). A nearby solution h0_guess, e.g. from
+    a neighbouring grid point, narrows the starting bracket (it is clamped
+    to the prior, a non-finite h0_guess starts cold). With
+    full_output=True a dict with the number of Brent iterations, the number
+    of theta evaluations, the achieved hubble_error and whether a solution
+    was found inside the prior is also returned. Without a solution inside
+    the prior range the closer end of the range is returned, as the
+    bisection did.
+    """
+    values = {}
+    def f(h0):
+        if h0 not in values:
+            values[h0] = theta(h0) - theta_true
+        return values[h0]
+
+    if h0_guess is None or not np.isfinite(h0_guess):
+        a, b = h_min, h_max
+    else:
+        a, b = _warm_bracket(f, min(max(float(h0_guess), h_min), h_max))
+    if f(a) * f(b) > 0:
+        # no solution inside the prior: like the bisection, stop at the closer end
+        h0, iterations, converged = min((a, b), key=lambda h: abs(f(h))), 0, False
+    else:
+        from scipy.optimize import brentq   # deferred, see instrument.quad
+        h0, result = brentq(f, a, b, xtol=hubble_error, full_output=True)
+        iterations, converged = result.iterations, result.converged
+    if instrument.enabled:
+        instrument.record(iterations=iterations)
+    if not full_output:
+        return h0
+    theta_error = abs(f(h0))
+    info = {'iterations': iterations,
+            'function_calls': len(values),
+            'hubble_error': theta_error,
+            'converged': converged}
+    return h0, info
+
+
+#--------- SOLVING A BATCH IN LOCK-STEP ---------#
+
+# For a whole grid of models the root finding runs on arrays: every
+# iteration evaluates theta once for all unconverged points (a single
+# vectorized call of the fixed-node integrals) and takes an Illinois
+# (modified regula falsi) step, falling back to bisection when the step
+# leaves the bracket. Points are processed in chunks of batch_size to bound
+# the memory of the node arrays.
+
+batch_size = 4096   # number of points solved in lock-step at a time
+max_iterations = 100   # maximum number of lock-step iterations
+
+
+@profiled
+def theta_batch_solver(theta, theta_true, hubble_error, size):
+    """Finding h0 such that theta(h0) = theta_true for size points at once
+
+    theta(h0, index) evaluates the points with the flat indices index at the
+    values h0 (both arrays). Returns h0 and a boolean array telling which
+    points converged to within hubble_error. Points without a solution
+    inside the prior get the closer end of the range and converged=False,
+    like theta_solver.
+    """
+    h0 = np.empty(size)
+    converged = np.zeros(size, dtype=bool)
+    for start in range(0, size, batch_size):
+        index = np.arange(start, min(start + batch_size, size))
+        h0[index], converged[index] = _lock_step(theta, theta_true, hubble_error, index)
+    return h0, converged
+
+
+def _lock_step(theta, theta_true, hubble_error, index):
+    """Solving the points index together, returns their h0 and convergence flags"""
+    a, b = np.full(index.size, float(h_min)), np.full(index.size, float(h_max))
+    f_a, f_b = theta(a, index) - theta_true, theta(b, index) - theta_true
+    # without a solution inside the prior stop at the closer end
+    h0 = np.where(np.abs(f_a) <= np.abs(f_b), a, b)
+    converged = np.zeros(index.size, dtype=bool)
+    active = np.flatnonzero(f_a * f_b <= 0)
+    for _ in range(max_iterations):
+        if not active.size:
+            break
+        a_, b_, fa, fb = a[active], b[active], f_a[active], f_b[active]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            c = b_ - fb*(b_ - a_)/(fb - fa)
+        inside = (c > np.minimum(a_, b_)) & (c < np.maximum(a_, b_))
+        c = np.where(inside, c, (a_ + b_)/2)
+        fc = theta(c, index[active]) - theta_true
+        if instrument.enabled:
+            instrument.record(iterations=active.size)
+        # Illinois step: keep the end on the other side of the root, halving
+        # its value if it is kept twice so that both ends converge
+        flip = np.sign(fc) != np.sign(fb)
+        a[active], f_a[active] = np.where(flip, b_, a_), np.where(flip, fb, fa/2)
+        b[active], f_b[active] = c, fc
+        h0[active] = c
+        done = (np.abs(c - b_) <= hubble_error) | (np.abs(c - a[active]) <= hubble_error) | (fc == 0)
+        converged[active[done]] = True
+        active = active[~done]
+    return h0, converged
@@ -0,0 +1,107 @@
+import functools
+from functools import cached_property
+
+import numpy as np
+
+from main import cache
+from main.models import get_model
+from main.params import planck18
+
+
+state_cache_size = 1024   # number of parameter points whose states are kept
+tables_per_state = 8   # number of distance tables (redshift sets) kept per state
+
+
+#--------- MODEL STATE OF ONE PARAMETER POINT ---------#
+
+# The derived quantities of a parameter point depend on each other: Omega_m0
+# and the distance tables need h0, which needs the sound horizon and d_A.
+# A ModelState computes each of them on first access and keeps it, so every
+# consumer of the same point (Omega_m0, the likelihoods, the figure scripts)
+# shares a single h0 solve. h0, r_s, r_d and d_A(z_*) come from main.cache,
+# so they are also shared with the on-disk store.
+
+
+class ModelState:
+    """Lazily computed, memoized derived quantities of a registered model (see main/models.py) at point"""
+
+    def __init__(self, model='LCDM', point=(), params=planck18):
+        self.model, self.point, self.params = get_model(model), tuple(point), params
+        self._tables = {}
+
+    def __repr__(self):
+        return 'ModelState({}{})'.format(self.model.name, ''.join(
+            ', {}={}'.format(name, value) for name, value in zip(self.model.parameters, self.point)))
+
+    @cached_property
+    def derived(self):
+        """h0, r_s, r_d and d_A(z_*) from one solve"""
+        return cache.derived(self.model.name, self.point, self.params)
+
+    @cached_property
+    def h0(self):
+        return self.derived['h0']
+
+    @cached_property
+    def r_s(self):
+        return self.derived['r_s']
+
+    @cached_property
+    def r_d(self):
+        return self.derived['r_d']
+
+    @cached_property
+    def d_A(self):
+        return self.derived['d_A']
+
+    @cached_property
+    def Omega_m0(self):
+        return self.params.w_m / self.h0**2
+
+    @cached_property
+    def z_dagger(self):
+        """Redshift where Q is not smooth (the transition redshift of gDE), infinite if there is none"""
+        kink = self.model.kink(*self.point)
+        return np.inf if kink is None else float(kink)
+
+    def hubble(self, z):
+        """H(z) in [km/s/Mpc]"""
+        return self.model.hubble(z, self.h0, *self.point, params=self.params)
+
+    def E(self, z):
+        return self.hubble(z) / (100*self.h0)
+
+    def distances(self, z):
+        """D_M(z), D_H(z), D_V(z) and D_L(z), integrated once per set of redshifts"""
+        z = np.asarray(z, dtype=float)
+        key = (z.shape, z.tobytes())
+        if key not in self._tables:
+            if len(self._tables) == tables_per_state:
+                self._tables.pop(next(iter(self._tables)))
+            self._tables[key] = self.model.distance_table(z, self.h0, *self.point, params=self.params)
+        return self._tables[key]
+
+    def d_M(self, z):
+        return self.distances(z)[0]
+
+
+@functools.lru_cache(maxsize=state_cache_size)
+def _model_state(model, point, params):
+    return ModelState(model, point, params)
+
+
+def state(model, *point, params=planck18):
+    """The shared ModelState of a point of any registered model (one per point in each process)"""
+    return _model_state(get_model(model).name, tuple(float(p) for p in point), params)
+
+
+def model_state(gamma=None, lamda=None, params=planck18):
+    """The shared ModelState of LCDM (gamma = lamda = None) or of gDE at (gamma, lamda)"""
+    if gamma is None:
+        return state('LCDM', params=params)
+    return state('gDE', gamma, lamda, params=params)
+
+
+def clear_states():
+    """Forgetting all shared states (the solutions in main.cache are kept)"""
+    _model_state.cache_clear()
@@ -2,133 +2,94 @@
 # https://archive.stsci.edu/hlsps/ps1cosmo/scolnic/binned_data/hlsp_ps1cosmo_panstarrs_gpc1_all_model_v1_lcparam.txt
 # https://archive.stsci.edu/doi/resolve/resolve.html?doi=10.17909/T95Q4X
 
-import matplotlib.pylab as pylab
-import matplotlib.pyplot as plt
-import matplotlib.ticker as tck
 import numpy as np
-import pandas as pd
-from scipy.integrate import quad
-
-from main.gde_cdm import hubble_finder_gDE
-from main.lcdm import hubble_finder_LCDM
-
-# Adjusting size of the figure
-params = {'legend.fontsize': '14',
-          'figure.figsize': (19.20, 10.80),
-          'axes.labelsize': '20',
-          'xtick.labelsize':'20',
-          'ytick.labelsize':'20'}
-pylab.rcParams.update(params)
-
-# Parameters
-c = 299792.458   # speed of light in [km/s]
-N_eff = 3.046   # effective neutrino number
-
-w_b = 0.022383   # physical baryon density parameter
-w_c = 0.12011   # physical cold dark matter density parameter
-w_m = w_b + w_c   # physical matter density parameter
-
-w_p = 2.469 * 10**(-5)   # physical photon density parameter
-w_n = 2.469 * 10**(-5)*(7/8)*(4/11)**(4/3)*N_eff   # physical neutrino density parameter
-w_r = w_p + w_n  # physical radiation density parameter
-
-
-# Calculating M_B
-
-def Mb_finder_LCDM(row):
-    z_i, mb, mb_err = row[[1, 4, 5]]
-    h0 = hubble_finder_LCDM()
-    def integrand(z):
-        return c / (100 * np.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r)))
-    integral = quad(integrand, 0, z_i)[0]
-    distance_mod = 5*np.log10((1+z_i)*10**5*integral)
-    Mb = mb - distance_mod
-    Mb_error = mb_err
-    return (z_i, Mb, Mb_error)
-
-
-def Mb_finder_gDE(row, gamma, lamda):
-    z_i, mb, mb_err = row[[1, 4, 5]]
-    h0 = hubble_finder_gDE(gamma, lamda)
-    y = 1 / (1 - lamda)
-    def integrand(z):
-        x = 1 - 3*gamma*(lamda-1)*np.log(1+z)
-        Q = np.copysign(1, x)*abs(x)**y
-        return c / (100 * np.sqrt(w_m*(1+z)**3 + w_r*(1+z)**4 + (h0**2-w_m-w_r)*Q))
-    integral = quad(integrand, 0, z_i)[0]
-    distance_mod = 5*np.log10((1+z_i)*10**5*integral)
-    Mb = mb - distance_mod
-    Mb_error = mb_err
-    return (z_i, Mb, Mb_error)
-
-
-# Importing data
-data = pd.read_csv('mb_data.txt', sep=' ')
-
-# ------------ LCDM ---------------
-Mb_LCDM = data.apply(Mb_finder_LCDM, axis=1)
-z_values_lcdm, M_b_values_lcdm, M_b_err_values_lcdm = [], [], []
-
-for z_i, M_b, M_b_err in  Mb_LCDM:
-    z_values_lcdm.append(z_i)
-    M_b_values_lcdm.append(M_b)
-    M_b_err_values_lcdm.append(M_b_err)
-
-
-# ------------ gDE ------------------
+
+from main.sn_catalog import SNCatalog
+
+
+# gDE parameters of the plotted residuals
 gamma = -0.016
 lamda = -18
 
-Mb_gDE = data.apply(Mb_finder_gDE, args=(gamma, lamda), axis=1)
-z_values_gde, M_b_values_gde, M_b_err_values_gde = [], [], []
 
-for z_i, M_b, M_b_err in  Mb_gDE:
-    z_values_gde.append(z_i)
-    M_b_values_gde.append(M_b)
-    M_b_err_values_gde.append(M_b_err)
+def compute():
+    """Computing M_B = m_B - mu(z) of every supernova for LCDM and gDE"""
+    # Importing data (converted to memory-mapped columns on the first run, so
+    # unbinned or simulated catalogs of millions of rows work the same way)
+    data = SNCatalog('mb_data.txt')
+
+    # Chunks of supernovae at once (one distance table per chunk and model)
+    return {'z_values': np.array(data.z_cmb),
+            'M_b_values_lcdm': data.M_B()[0],
+            'M_b_values_gde': data.M_B('gDE', (gamma, lamda))[0],
+            'M_b_err_values': np.array(data.dm_b)}
+
+
+def plot(data, show=True):
+    """Drawing the figure from the data of compute()"""
+    import matplotlib.pylab as pylab
+    import matplotlib.pyplot as plt
+    import matplotlib.ticker as tck
+
+    # Adjusting size of the figure
+    params = {'legend.fontsize': '14',
+              'figure.figsize': (19.20, 10.80),
+              'axes.labelsize': '20',
+              'xtick.labelsize':'20',
+              'ytick.labelsize':'20'}
+    pylab.rcParams.update(params)
+
+    z_values_lcdm = z_values_gde = data['z_values']
+    M_b_values_lcdm, M_b_values_gde = data['M_b_values_lcdm'], data['M_b_values_gde']
+    M_b_err_values_lcdm = M_b_err_values_gde = data['M_b_err_values']
+
+    #---------- PLOTTING ----------
+
+    # Function (1+x)**(1/2)
+    def forward(x):
+        return x**(1/3)
 
-#---------- PLOTTING ----------
+    def inverse(x):
+        return x**3
 
-# Function (1+x)**(1/2)
-def forward(x):
-	return x**(1/3)
+    # latex rendering text fonts
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
 
-def inverse(x):
-    return x**3
+    fig, ax0 = plt.subplots()  # adjusting the size of the figure
+    ax0.errorbar(z_values_lcdm, M_b_values_lcdm, yerr=M_b_err_values_lcdm, fmt='s', ecolor='black', label='$\Lambda$CDM' )
+    ax0.errorbar(z_values_gde, M_b_values_gde, yerr=M_b_err_values_gde, fmt='v', ecolor='red', label=r'$\Lambda_{\rm g}$CDM ($\gamma=-0.016, \lambda=-18$)')
 
-# latex rendering text fonts
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+    # ---------- GRAPH OPTIONS ----------
 
-fig, ax0 = plt.subplots()  # adjusting the size of the figure
-ax0.errorbar(z_values_lcdm, M_b_values_lcdm, yerr=M_b_err_values_lcdm, fmt='s', ecolor='black', label='$\Lambda$CDM' )
-ax0.errorbar(z_values_gde, M_b_values_gde, yerr=M_b_err_values_gde, fmt='v', ecolor='red', label=r'$\Lambda_{\rm g}$CDM ($\gamma=-0.016, \lambda=-18$)')
+    ax0.set_xlim(0.011, 1.613)
+    # Setting Label
+    ax0.set_ylabel('$M_B$ [mag]')
+    ax0.set_xlabel('$z$')
+    # Scaling
+    ax0.set_xscale('function', functions=(forward, inverse))
+    ax0.set_xticks([0.05, 0.1, 0.5, 1, 1.7])
+    # Minor Ticks
+    ax0.yaxis.set_ticks_position('both')
+    ax0.xaxis.set_ticks_position('both')
+    ax0.yaxis.set_minor_locator(tck.AutoMinorLocator())
+    # Tick Options
+    ax0.tick_params(which='major', width=1, size = 7, direction='in')
+    ax0.tick_params(which='minor', width=0.6, size = 4, direction='in')
+    plt.legend()
 
-# ---------- GRAPH OPTIONS ----------
+    plt.fill_between(z_values_gde, -19.244-0.037, -19.2435+0.037, color='blue', alpha=0.5)
+    plt.fill_between(z_values_gde,  -19.401-0.027, -19.401+0.027, color='red', alpha=0.5)
 
-ax0.set_xlim(0.011, 1.613)
-# Setting Label
-ax0.set_ylabel('$M_B$ [mag]')
-ax0.set_xlabel('$z$')
-# Scaling
-ax0.set_xscale('function', functions=(forward, inverse))
-ax0.set_xticks([0.05, 0.1, 0.5, 1, 1.7])
-# Minor Ticks
-ax0.yaxis.set_ticks_position('both')
-ax0.xaxis.set_ticks_position('both')
-ax0.yaxis.set_minor_locator(tck.AutoMinorLocator())
-# Tick Options
-ax0.tick_params(which='major', width=1, size = 7, direction='in')
-ax0.tick_params(which='minor', width=0.6, size = 4, direction='in')
-plt.legend()
+    plt.text(1.3, -19.41, '$M_B^{P18}$', verticalalignment='top')
+    plt.text(1.3, -19.26, '$M_B^{R20}$', verticalalignment='top')
 
-plt.fill_between(z_values_gde, -19.244-0.037, -19.2435+0.037, color='blue', alpha=0.5)
-plt.fill_between(z_values_gde,  -19.401-0.027, -19.401+0.027, color='red', alpha=0.5)
 
-plt.text(1.3, -19.41, '$M_B^{P18}$', verticalalignment='top')
-plt.text(1.3, -19.26, '$M_B^{R20}$', verticalalignment='top')
+    if show:
+        plt.show()
+    ax0.set_rasterized(True)
+    fig.savefig('plots/mb_analysis.eps',rasterized=True,dpi=600)
 
 
-plt.show()
-ax0.set_rasterized(True)
-fig.savefig('plots/mb_analysis.eps',rasterized=True,dpi=600)
+if __name__ == '__main__':
+    plot(compute())
@@ -1,20 +1,10 @@
 # gDE-CDM Model Calculations
 # Calculating the Omega_m,0 for a given gamma and lambda
 
-import matplotlib.pylab as pylab
-import matplotlib.pyplot as plt
-from matplotlib import cm
 import numpy as np
 
 from main.gde_cdm import Omega_m0
-
-# Adjusting size of the figure
-params = {'legend.fontsize': '14',
-          'figure.figsize': (19.20, 10.80),
-          'axes.labelsize': '20',
-          'xtick.labelsize':'20',
-          'ytick.labelsize':'20'}
-pylab.rcParams.update(params)
+from main.grid_scan import scan_grid
 
 
 # gamma values starting from gamma = -0.001 to gamma = -0.018 with step size 0.001
@@ -24,37 +14,61 @@ gamma_values = np.arange(-0.001, -0.018, -0.001)
 lamda_values = np.arange(-4, -24.5, -0.5)
 
 
-X, Y = np.meshgrid(gamma_values, lamda_values)
+def compute(processes=None):
+    """Computing Omega_m,0 on the (gamma, lambda) grid"""
+    # Independent solves distributed over all cores; Z[j, i] belongs to (gamma_i, lambda_j).
+    # Results are checkpointed in data/, so an interrupted scan resumes where it stopped
+    # and a finished one is only read back. Omega_m0 reads h0 from the shared state of
+    # each point, so it costs a single solve that later r_s, r_d or D_M requests reuse.
+    X, Y, Z = scan_grid(Omega_m0, gamma_values, lamda_values, processes, store='data/omega_m0_parameter')
+    return {'X': X, 'Y': Y, 'Z': Z}
+
+
+def plot(data, show=True):
+    """Drawing the figure from the data of compute()"""
+    import matplotlib.pylab as pylab
+    import matplotlib.pyplot as plt
+    from matplotlib import cm
+
+    # Adjusting size of the figure
+    params = {'legend.fontsize': '14',
+              'figure.figsize': (19.20, 10.80),
+              'axes.labelsize': '20',
+              'xtick.labelsize':'20',
+              'ytick.labelsize':'20'}
+    pylab.rcParams.update(params)
+
+    X, Y, Z = data['X'], data['Y'], data['Z']
+
+    # ---------- PLOTTING ----------
 
-variable_grid_data = list((x, y) for x in gamma_values for y in lamda_values)
-data_points = [Omega_m0(x, y) for (x, y) in variable_grid_data]
-new_points = np.reshape(data_points, (len(gamma_values), len(lamda_values)))
-Z = np.transpose(new_points)
+    # latex rendering text fonts
+    plt.rc('text', usetex=True)
+    plt.rc('font', family='serif')
 
-# ---------- PLOTTING ----------
 
-# latex rendering text fonts
-plt.rc('text', usetex=True)
-plt.rc('font', family='serif')
+    fig, ax0 = plt.subplots()  # adjusting the size of the figure
+    plt.contourf(X, Y, Z, cmap=cm.plasma, antialiased=True)
 
+    # ---------- GRAPH OPTIONS ----------
 
-fig, ax0 = plt.subplots()  # adjusting the size of the figure
-plt.contourf(X, Y, Z, cmap=cm.plasma, antialiased=True)
+    # Setting Limits
+    ax0.set_xlim(-0.001, -0.018)
+    # Setting Labels
+    ax0.set_xlabel('$\gamma$')
+    ax0.set_ylabel('$\lambda$')
+    # Tick Options
+    ax0.tick_params(which='major', width=1, size=7, direction='in')
+    # Other Options
+    cbar = plt.colorbar()
+    cbar.set_label(r'$\Omega_{\rm m,0}$')
+    plt.imshow(Z, vmin=0., vmax=3., cmap=cm.plasma, origin='lower', extent=[X.min(), X.max(), Y.min(), Y.max()], aspect=8)
+    plt.axis('tight')
 
-# ---------- GRAPH OPTIONS ----------
+    if show:
+        plt.show()
+    fig.savefig('plots/omega_m0_parameter.eps', format='eps', dpi=600)
 
-# Setting Limits
-ax0.set_xlim(-0.001, -0.018)
-# Setting Labels
-ax0.set_xlabel('$\gamma$')
-ax0.set_ylabel('$\lambda$')
-# Tick Options
-ax0.tick_params(which='major', width=1, size=7, direction='in')
-# Other Options
-cbar = plt.colorbar()
-cbar.set_label(r'$\Omega_{\rm m,0}$')
-plt.imshow(Z, vmin=0., vmax=3., cmap=cm.plasma, origin='lower', extent=[X.min(), X.max(), Y.min(), Y.max()], aspect=8)
-plt.axis('tight')
 
-plt.show()
-fig.savefig('plots/omega_m0_parameter.eps', format='eps', dpi=600)
+if __name__ == '__main__':
+    plot(compute())
@@ -0,0 +1,313 @@
+# Local HTTP service for h0, D_M(z) and E(z)
+# Keeps the model kernels imported and compiled in one process, so a query
+# costs milliseconds instead of a Python start-up. Concurrent h0 queries are
+# coalesced into one lock-step batch solve and repeated points are answered
+# from memory:
+#     python service.py [--port 8765]
+#     curl 'localhost:8765/h0?gamma=-0.016&lamda=-18'
+#     curl 'localhost:8765/d_M?gamma=-0.016&lamda=-18&z=0.5,1,2'
+#     curl 'localhost:8765/E?model=LCDM&z=0.5,1,2'
+#     curl -d '{"gamma": [-0.016, -0.01], "lamda": [-18, -12]}' localhost:8765/h0
+# Every endpoint takes model= (gDE by default, see main/models.py) and the
+# model's parameters, either as a query string or as a JSON body.
+
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import functools
+import json
+import time
+import urllib.parse
+
+import numpy as np
+
+from main import compiled
+from main.cache import cache_size
+from main.models import get_model, models
+from main.params import planck18
+
+
+batch_window = 0.002   # seconds h0 queries are collected before a batch is solved
+max_batch = 4096   # largest batch, a full batch is solved at once
+max_body = 1 << 20   # largest accepted request body in bytes
+
+
+#--------- MICRO-BATCHING ---------#
+
+# The first h0 query of a model opens a window of batch_window seconds; all
+# queries arriving in it are solved together by the model's hubble_batch
+# (main/solver.py's lock-step solver on the fixed-node integrals), which
+# costs little more than a single point. The solves run in one worker thread
+# so the event loop keeps accepting requests meanwhile. The solved h0 are
+# kept in a bounded LRU dict (cache_size points, as main/cache.py) keyed on
+# the model and point, so repeated queries never reach the solver.
+
+
+class Engine:
+    """h0 of any registered model with micro-batched solves and an LRU of the solutions"""
+
+    def __init__(self, params=planck18, window=batch_window, size=max_batch):
+        self.params, self.window, self.size = params, window, size
+        self.h0 = collections.OrderedDict()   # (model, point) -> (h0, converged)
+        self.pending = {}   # model -> [(point, future)]
+        self.timers = {}
+        self.tasks = set()   # running batch solves, referenced until they finish
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.stats = {'queries': 0, 'hits': 0, 'batches': 0, 'solved': 0}
+
+    def warm(self):
+        """Compiling the integrands and running every solver path once"""
+        compiled.available()
+        for name, model in models.items():
+            self._solve_points(name, [_example(model)])
+
+    async def hubble(self, model, point):
+        """(h0, converged) of model at point"""
+        key = (model.name, point)
+        self.stats['queries'] += 1
+        if key in self.h0:
+            self.stats['hits'] += 1
+            self.h0.move_to_end(key)
+            return self.h0[key]
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self.pending.setdefault(model.name, [])
+        pending.append((point, future))
+        if len(pending) >= self.size:
+            self._flush(model.name)
+        elif model.name not in self.timers:
+            self.timers[model.name] = loop.call_later(self.window, self._flush, model.name)
+        return await future
+
+    def _flush(self, name):
+        timer = self.timers.pop(name, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self.pending.pop(name, [])
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._solve(name, batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def _solve(self, name, batch):
+        points = list(dict.fromkeys(point for point, future in batch))
+        try:
+            h0, converged = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self._solve_points, name, points)
+        except Exception as error:
+            for point, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.stats['batches'] += 1
+        self.stats['solved'] += len(points)
+        solved = {point: (float(h), bool(c)) for point, h, c in zip(points, h0, converged)}
+        for point, value in solved.items():
+            self.h0[(name, point)] = value
+        while len(self.h0) > cache_size:
+            self.h0.popitem(last=False)
+        for point, future in batch:
+            if not future.done():
+                future.set_result(solved[point])
+
+    def _solve_points(self, name, points):
+        model = get_model(name)
+        if not model.parameters:
+            h0 = model.hubble_finder(params=self.params, fast=True)
+            return [h0]*len(points), [True]*len(points)
+        return model.hubble_batch(*np.array(points, dtype=float).T, params=self.params)
+
+    async def run(self, func, *args):
+        """func(*args) in the worker thread"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+def _example(model):
+    """A point inside the prior of the model, for warming up"""
+    return {'gDE': (-0.016, -18), 'wCDM': (-1,), 'CPL': (-1, 0)}.get(model.name, ())[:len(model.parameters)]
+
+
+#--------- ENDPOINTS ---------#
+
+class BadRequest(Exception):
+    pass
+
+
+class NotFound(Exception):
+    pass
+
+
+def _values(query, name):
+    """A parameter as a list of finite floats (comma separated in a query string, a number or list in JSON)"""
+    if name not in query:
+        raise BadRequest('missing parameter {!r}'.format(name))
+    value = query[name]
+    if isinstance(value, str):
+        value = value.split(',')
+    try:
+        values = [float(v) for v in np.atleast_1d(value)]
+    except (TypeError, ValueError):
+        raise BadRequest('parameter {!r} must be numbers, not {!r}'.format(name, query[name])) from None
+    if not np.all(np.isfinite(values)):
+        raise BadRequest('parameter {!r} must be finite, not {!r}'.format(name, query[name]))
+    return values
+
+
+def _points(model, query):
+    """The parameter points of the query and whether a single point was asked for"""
+    columns = [_values(query, name) for name in model.parameters]
+    if not columns:
+        return [()], True
+    if len({len(column) for column in columns}) != 1:
+        raise BadRequest('the parameters {} must have the same length'.format(', '.join(model.parameters)))
+    single = all(not isinstance(query[name], (list, tuple)) and ',' not in str(query[name])
+                 for name in model.parameters)
+    return list(zip(*columns)), single
+
+
+async def h0_endpoint(engine, model, query):
+    points, single = _points(model, query)
+    solutions = await asyncio.gather(*(engine.hubble(model, point) for point in points))
+    results = [dict(zip(model.parameters, point), h0=h0, converged=converged)
+               for point, (h0, converged) in zip(points, solutions)]
+    return results[0] if single else results
+
+
+async def curve_endpoint(engine, model, query, quantity):
+    points, single = _points(model, query)
+    z = np.array(_values(query, 'z'))
+    if np.any(z <= -1):
+        raise BadRequest('redshifts must be above -1')
+    solutions = await asyncio.gather(*(engine.hubble(model, point) for point in points))
+    results = []
+    for point, (h0, converged) in zip(points, solutions):
+        if quantity == 'd_M':
+            try:
+                table = await engine.run(functools.partial(model.distance_table, z, h0, *point,
+                                                           params=engine.params))
+            except ValueError as error:   # e.g. negative redshifts, see distance_table
+                raise BadRequest(str(error)) from None
+            values = table[0]
+        else:
+            values = model.E(z, h0, *point, params=engine.params)
+        results.append(dict(zip(model.parameters, point), h0=h0, converged=converged,
+                            z=z.tolist(), **{quantity: np.asarray(values).tolist()}))
+    return results[0] if single else results
+
+
+async def dispatch(engine, path, query):
+    """The JSON response of an endpoint"""
+    if path == '/health':
+        return {'status': 'ok', 'models': list(models), 'cached': len(engine.h0), **engine.stats}
+    if path not in ('/h0', '/d_M', '/E'):
+        raise NotFound(path)
+    try:
+        model = get_model(query.get('model', 'gDE'))
+    except ValueError as error:
+        raise BadRequest(str(error)) from None
+    if path == '/h0':
+        return await h0_endpoint(engine, model, query)
+    return await curve_endpoint(engine, model, query, path[1:])
+
+
+#--------- HTTP ---------#
+
+# A minimal HTTP/1.1 server on asyncio streams (GET with a query string or
+# POST with a JSON body, keep-alive), so the service needs nothing beyond
+# the standard library and NumPy/SciPy.
+
+reasons = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+async def _read_request(reader):
+    """(method, path, query, keep_alive) of the next request, None at the end of the connection"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode('latin-1').split()
+    except ValueError:
+        raise BadRequest('malformed request line') from None
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    url = urllib.parse.urlsplit(target)
+    query = dict(urllib.parse.parse_qsl(url.query))
+    length = int(headers.get('content-length', 0))
+    if length > max_body:
+        raise BadRequest('request body too large')
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except json.JSONDecodeError:
+            raise BadRequest('body is not valid JSON') from None
+        if not isinstance(body, dict):
+            raise BadRequest('body must be a JSON object')
+        query.update(body)
+    keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+    return method, url.path, query, keep_alive
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = ('HTTP/1.1 {} {}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n'
+            'Connection: {}\r\n\r\n').format(status, reasons[status], len(body), 'keep-alive' if keep_alive else 'close')
+    return head.encode() + body
+
+
+async def handle(engine, reader, writer):
+    """Serving the requests of one connection"""
+    try:
+        while True:
+            keep_alive = False
+            try:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, path, query, keep_alive = request
+                if method not in ('GET', 'POST'):
+                    status, payload = 405, {'error': 'use GET or POST'}
+                else:
+                    status, payload = 200, await dispatch(engine, path, query)
+            except BadRequest as error:
+                status, payload = 400, {'error': str(error)}
+            except NotFound as error:
+                status, payload = 404, {'error': 'no endpoint {}, use /h0, /d_M, /E or /health'.format(error)}
+            except Exception as error:
+                status, payload = 500, {'error': '{}: {}'.format(type(error).__name__, error)}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host='127.0.0.1', port=8765, engine=None):
+    """Running the service until cancelled"""
+    engine = engine or Engine()
+    start = time.perf_counter()
+    await asyncio.get_running_loop().run_in_executor(engine.executor, engine.warm)
+    server = await asyncio.start_server(lambda reader, writer: handle(engine, reader, writer), host, port)
+    print('serving on http://{}:{} (warmed up in {:.1f} s)'.format(host, port, time.perf_counter() - start))
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='HTTP service for h0, D_M(z) and E(z)')
+    parser.add_argument('--host', default='127.0.0.1', help='address to listen on (default: localhost only)')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--window', type=float, default=batch_window, help='seconds h0 queries are batched over')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, Engine(window=args.window)))
+    except KeyboardInterrupt:
+        pass